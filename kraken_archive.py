@@ -0,0 +1,146 @@
+import os
+import threading
+
+import numpy as np
+
+from kraken_btc_tracker import Candles, _as_candles, get_24h_btc_prices
+
+# ===== ON-DISK CANDLE ARCHIVE =====
+# One append-only file of fixed-width candle records per (pair, interval),
+# plus an index file holding just the timestamps (sorted, int64).
+# Both are memory-mapped, so "candles between T1 and T2" is a binary search
+# over the index and a zero-copy slice of the records.
+
+# Default folder for archive files
+ARCHIVE_DIR = 'candle_archive'
+
+# Fixed-width candle record (same fields get_24h_btc_prices parses)
+RECORD_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('vwap', '<f8'),
+    ('volume', '<f8'),
+    ('count', '<i8')
+])
+INDEX_DTYPE = np.dtype('<i8')
+
+
+class CandleArchive:
+    """
+    Append-only candle archive for one (pair, interval). Single writer, many readers.
+    """
+
+    def __init__(self, trading_pair, interval, root=ARCHIVE_DIR):
+        self.trading_pair = trading_pair
+        self.interval = interval
+        os.makedirs(root, exist_ok=True)
+
+        name = f"{trading_pair.replace('/', '_')}_{interval}"
+        self.path = os.path.join(root, f"{name}.bin")
+        self.index_path = os.path.join(root, f"{name}.idx")
+
+        self._lock = threading.Lock()
+        self._maps = None  # (record count, records memmap, index memmap)
+
+        for path in (self.path, self.index_path):
+            if not os.path.exists(path):
+                open(path, 'wb').close()
+        self._repair()
+
+    def _repair(self):
+        # An interrupted append can leave the two files with different lengths -
+        # cut both back to the last complete record
+        count = min(os.path.getsize(self.path) // RECORD_DTYPE.itemsize,
+                    os.path.getsize(self.index_path) // INDEX_DTYPE.itemsize)
+        for path, itemsize in ((self.path, RECORD_DTYPE.itemsize),
+                               (self.index_path, INDEX_DTYPE.itemsize)):
+            if os.path.getsize(path) != count * itemsize:
+                with open(path, 'r+b') as f:
+                    f.truncate(count * itemsize)
+
+    def __len__(self):
+        return os.path.getsize(self.index_path) // INDEX_DTYPE.itemsize
+
+    def _mapped(self):
+        # Re-map only when the files have grown since the last read
+        count = len(self)
+        if self._maps is None or self._maps[0] != count:
+            if count == 0:
+                self._maps = (0, np.empty(0, dtype=RECORD_DTYPE), np.empty(0, dtype=INDEX_DTYPE))
+            else:
+                self._maps = (count,
+                              np.memmap(self.path, dtype=RECORD_DTYPE, mode='r', shape=(count,)),
+                              np.memmap(self.index_path, dtype=INDEX_DTYPE, mode='r', shape=(count,)))
+        return self._maps[1], self._maps[2]
+
+    def last_time(self):
+        records, index = self._mapped()
+        return int(index[-1]) if len(index) else None
+
+    def append(self, candles):
+        """
+        Add candles newer than the archive's last record. A candle with the same
+        timestamp as the last record replaces it (the still-forming candle).
+        Returns the number of new records written.
+        """
+        candles = _as_candles(candles)
+        if not len(candles):
+            return 0
+
+        records = np.empty(len(candles), dtype=RECORD_DTYPE)
+        for field in Candles.FIELDS:
+            records[field] = getattr(candles, field)
+
+        with self._lock:
+            last_time = self.last_time()
+            if last_time is not None:
+                # Overwrite the last record in place if it was re-sent
+                same = records[records['time'] == last_time]
+                if len(same):
+                    with open(self.path, 'r+b') as f:
+                        f.seek((len(self) - 1) * RECORD_DTYPE.itemsize)
+                        f.write(same[-1:].tobytes())
+                    self._maps = None
+                records = records[records['time'] > last_time]
+
+            if not len(records):
+                return 0
+
+            # Timestamps must stay sorted for the binary-search index
+            records = records[np.argsort(records['time'], kind='stable')]
+
+            with open(self.path, 'ab') as f:
+                f.write(records.tobytes())
+            with open(self.index_path, 'ab') as f:
+                f.write(records['time'].astype(INDEX_DTYPE).tobytes())
+            return len(records)
+
+    def records(self, start=None, end=None):
+        """
+        Zero-copy view of the raw records with start <= time <= end
+        """
+        records, index = self._mapped()
+        lo = 0 if start is None else int(np.searchsorted(index, start, side='left'))
+        hi = len(index) if end is None else int(np.searchsorted(index, end, side='right'))
+        return records[lo:hi]
+
+    def read(self, start=None, end=None):
+        """
+        Candles with start <= time <= end (unix seconds) as a Candles container
+        """
+        records = self.records(start, end)
+        return Candles(*(records[field] for field in Candles.FIELDS))
+
+
+def update_archive(trading_pair='XXBTZUSD', interval=1, root=ARCHIVE_DIR):
+    """
+    Fetch the latest candles from Kraken and append the new ones to the archive
+    """
+    archive = CandleArchive(trading_pair, interval, root)
+    candles = get_24h_btc_prices(trading_pair, interval, num_candles=720)
+    added = archive.append(candles)
+    print(f"✓ Archived {added} new candles of {trading_pair} ({len(archive)} total)")
+    return archive
@@ -0,0 +1,231 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from kraken_archive import ARCHIVE_DIR, CandleArchive, update_archive
+from kraken_batch import VOLUME_TREND_CANDLES, fibonacci_zones, volume_signals
+from kraken_btc_tracker import (
+    _as_candles, parse_pair, parse_interval, UPTREND_ZONES, VOLUME_SIGNALS,
+    FIB_SIGNALS, FIB_SIGNAL_DIRECTIONS, VOLUME_SIGNAL_DIRECTIONS
+)
+
+# ===== SIGNAL BACKTESTER =====
+# Slides the calculate_fibonacci_levels and analyze_volume signal logic over
+# a long candle history. Every window position is evaluated at once with
+# rolling NumPy computations (no per-window function calls), then each signal
+# is scored against what the price did next: hit rate, forward return and
+# drawdown. Window lengths run in parallel worker processes.
+
+# Analysis window lengths (candles) and forward horizons (candles) to test
+BACKTEST_WINDOWS = [24, 96, 288]
+BACKTEST_HORIZONS = [1, 6, 24]
+
+# One row per (window, horizon, signal)
+BACKTEST_DTYPE = np.dtype([
+    ('window', 'i8'),
+    ('horizon', 'i8'),
+    ('kind', 'U10'),
+    ('signal', 'U64'),
+    ('direction', 'i1'),
+    ('occurrences', 'i8'),
+    ('hit_rate', 'f8'),
+    ('mean_return', 'f8'),
+    ('mean_drawdown', 'f8'),
+    ('max_drawdown', 'f8')
+])
+
+
+def _rolling(values, window, ufunc, fill):
+    # van Herk/Gil-Werman: prefix and suffix running extremes inside blocks of
+    # `window` values - O(n) no matter how long the window is
+    n = len(values)
+    if window == 1:
+        return values.copy()
+    padded = np.concatenate([values, np.full(-n % window, fill)]).reshape(-1, window)
+    prefix = ufunc.accumulate(padded, axis=1).ravel()
+    suffix = ufunc.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    return ufunc(suffix[:n - window + 1], prefix[window - 1:n])
+
+
+def rolling_max(values, window):
+    """
+    Max of every `window` consecutive values: out[i] = max(values[i:i + window])
+    """
+    return _rolling(np.asarray(values, dtype=np.float64), window, np.maximum, -np.inf)
+
+
+def rolling_min(values, window):
+    """
+    Min of every `window` consecutive values: out[i] = min(values[i:i + window])
+    """
+    return _rolling(np.asarray(values, dtype=np.float64), window, np.minimum, np.inf)
+
+
+def rolling_signals(close, volume, window):
+    """
+    Signal ids for every window of `window` candles, ending at candles window-1 .. n-1.
+    Returns (fib_ids into FIB_SIGNALS, volume_ids into VOLUME_SIGNALS) - the same
+    signals calculate_fibonacci_levels / analyze_volume give for each window.
+    """
+    if window < VOLUME_TREND_CANDLES:
+        raise ValueError(f"window must be at least {VOLUME_TREND_CANDLES} candles")
+    n = len(close)
+
+    # ----- Fibonacci zones: swing high/low are the rolling max/min close -----
+    current_price = close[window - 1:]
+    is_uptrend, zone_index = fibonacci_zones(
+        current_price, rolling_max(close, window), rolling_min(close, window))
+    fib_ids = np.where(is_uptrend, zone_index, zone_index + len(UPTREND_ZONES))
+
+    # ----- Volume: first/last 6 candles of each window -----
+    six = sliding_window_view(volume, VOLUME_TREND_CANDLES).sum(axis=1)
+    recent_volume_avg = six[window - VOLUME_TREND_CANDLES:] / VOLUME_TREND_CANDLES
+    earlier_volume_avg = six[:n - window + 1] / VOLUME_TREND_CANDLES
+    price_change = current_price - close[:n - window + 1]
+    _, volume_ids = volume_signals(price_change, recent_volume_avg, earlier_volume_avg)
+
+    return fib_ids, volume_ids
+
+
+def _score(ids, directions, forward_return, long_drawdown, short_drawdown):
+    # Per-signal hit rate, mean return and drawdowns, via one bincount per statistic
+    k = len(directions)
+    directions = np.asarray(directions)
+    direction = directions[ids]
+    # Drawdown on the side the signal trades (no call = holding long)
+    drawdown = np.where(direction < 0, short_drawdown, long_drawdown)
+
+    occurrences = np.bincount(ids, minlength=k)
+    hits = np.bincount(ids, weights=direction * forward_return > 0, minlength=k)
+    total_return = np.bincount(ids, weights=forward_return, minlength=k)
+    total_drawdown = np.bincount(ids, weights=drawdown, minlength=k)
+    worst = np.zeros(k)
+    np.minimum.at(worst, ids, drawdown)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hit_rate = np.where(directions != 0, hits / occurrences, np.nan)
+        mean_return = total_return / occurrences
+        mean_drawdown = total_drawdown / occurrences
+    worst = np.where(occurrences > 0, worst, np.nan)
+    return occurrences, hit_rate, mean_return, mean_drawdown, worst
+
+
+def backtest_window(close, high, low, volume, window, horizons=BACKTEST_HORIZONS):
+    """
+    Backtest every signal for one window length. Returns a BACKTEST_DTYPE table.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    parts = []
+    if n < window:
+        return np.zeros(0, dtype=BACKTEST_DTYPE)
+    fib_ids, volume_ids = rolling_signals(close, np.asarray(volume, dtype=np.float64), window)
+
+    for horizon in horizons:
+        # Signal at candle t is scored on candles t+1 .. t+horizon
+        scored = n - horizon - (window - 1)
+        if scored <= 0:
+            continue
+        entry = close[window - 1:n - horizon]
+        forward_return = close[window - 1 + horizon:] / entry - 1
+        future_low = rolling_min(low[window:], horizon)[:scored]
+        future_high = rolling_max(high[window:], horizon)[:scored]
+        long_drawdown = np.minimum(future_low / entry - 1, 0.0)
+        short_drawdown = np.minimum(1 - future_high / entry, 0.0)
+
+        for kind, ids, signals, directions in (
+                ('fibonacci', fib_ids[:scored], FIB_SIGNALS, FIB_SIGNAL_DIRECTIONS),
+                ('volume', volume_ids[:scored], VOLUME_SIGNALS, VOLUME_SIGNAL_DIRECTIONS)):
+            stats = _score(ids, directions, forward_return, long_drawdown, short_drawdown)
+            table = np.zeros(len(signals), dtype=BACKTEST_DTYPE)
+            table['window'] = window
+            table['horizon'] = horizon
+            table['kind'] = kind
+            table['signal'] = signals
+            table['direction'] = directions
+            (table['occurrences'], table['hit_rate'], table['mean_return'],
+             table['mean_drawdown'], table['max_drawdown']) = stats
+            parts.append(table)
+
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=BACKTEST_DTYPE)
+
+
+def _backtest_job(job):
+    # Runs in a worker process - one window length
+    return backtest_window(*job)
+
+
+def backtest(candles, windows=BACKTEST_WINDOWS, horizons=BACKTEST_HORIZONS, max_workers=None):
+    """
+    Backtest the Fibonacci and volume signals over a candle history for several
+    window lengths (in parallel worker processes). Returns one BACKTEST_DTYPE table.
+    """
+    candles = _as_candles(candles)
+    jobs = [(candles.close, candles.high, candles.low, candles.volume, window, list(horizons))
+            for window in windows]
+    workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+
+    if workers <= 1:
+        tables = [_backtest_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            tables = list(executor.map(_backtest_job, jobs))
+
+    return np.concatenate(tables) if tables else np.zeros(0, dtype=BACKTEST_DTYPE)
+
+
+def backtest_archive(trading_pair='XXBTZUSD', interval=1, start=None, end=None, root=ARCHIVE_DIR, **kwargs):
+    """
+    Backtest over the candles stored in the local archive (see kraken_archive.py)
+    """
+    return backtest(CandleArchive(trading_pair, interval, root).read(start, end), **kwargs)
+
+
+def print_backtest(table):
+    print("\n" + "="*100)
+    print("🧪 SIGNAL BACKTEST")
+    print("="*100)
+    for window in np.unique(table['window']):
+        for horizon in np.unique(table['horizon']):
+            rows = table[(table['window'] == window) & (table['horizon'] == horizon)]
+            if not len(rows):
+                continue
+            print(f"\nWindow {window} candles, scored {horizon} candles ahead")
+            print("-" * 100)
+            print(f"  {'Signal':60s} {'Count':>8s} {'Hit':>7s} {'Return':>8s} {'Avg DD':>8s} {'Max DD':>8s}")
+            for row in rows:
+                if not row['occurrences']:
+                    continue
+                hit = '-' if np.isnan(row['hit_rate']) else f"{row['hit_rate']:.1%}"
+                print(f"  {row['signal']:60s} {row['occurrences']:8d} {hit:>7s} "
+                      f"{row['mean_return']:+8.3%} {row['mean_drawdown']:8.3%} {row['max_drawdown']:8.3%}")
+    print("="*100 + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Kraken Signal Backtester')
+    parser.add_argument('--pair', type=parse_pair, default='BTC/USD',
+                        help='Trading pair (e.g., BTC/USD)')
+    parser.add_argument('--interval', type=parse_interval, default='1min',
+                        help='Candle interval of the archived history')
+    parser.add_argument('--windows', type=int, nargs='+', default=BACKTEST_WINDOWS,
+                        help='Analysis window lengths in candles')
+    parser.add_argument('--horizons', type=int, nargs='+', default=BACKTEST_HORIZONS,
+                        help='Forward horizons in candles')
+    parser.add_argument('--workers', type=int,
+                        help='Worker processes (default: one per CPU)')
+    parser.add_argument('--update', action='store_true',
+                        help='Fetch the latest candles into the archive first')
+    args = parser.parse_args()
+
+    if args.update:
+        update_archive(args.pair, args.interval)
+    candles = CandleArchive(args.pair, args.interval).read()
+    if not len(candles):
+        print("❌ No archived candles - run with --update first (see kraken_archive.py)")
+    else:
+        print(f"📈 Backtesting {len(candles):,} candles of {args.pair}")
+        print_backtest(backtest(candles, args.windows, args.horizons, args.workers))
@@ -0,0 +1,180 @@
+import numpy as np
+
+from kraken_btc_tracker import (
+    _as_candles, fetch_multiple_prices, INTERVALS,
+    FIB_ZONE_LEVELS, UPTREND_ZONES, DOWNTREND_ZONES, VOLUME_TRENDS, VOLUME_SIGNALS
+)
+
+# ===== BATCH SIGNAL EVALUATION =====
+# Runs the calculate_fibonacci_levels zone/signal logic and the analyze_volume
+# classification for a whole matrix of series (pairs x intervals) in one
+# vectorized NumPy pass and returns a structured result table.
+
+# Retracement ratios for the levels in FIB_ZONE_LEVELS, and for all 7 levels
+ZONE_RATIOS = np.array([0.236, 0.382, 0.500, 0.618])
+LEVEL_RATIOS = np.array([0.0, 0.236, 0.382, 0.500, 0.618, 0.786, 1.0])
+
+# Candles in the recent/earlier volume averages (same as analyze_volume)
+VOLUME_TREND_CANDLES = 6
+
+# One row per (pair, interval) series
+RESULT_DTYPE = np.dtype([
+    ('pair', 'U16'),
+    ('interval', 'i8'),
+    ('candles', 'i8'),
+    ('current_price', 'f8'),
+    ('swing_high', 'f8'),
+    ('swing_low', 'f8'),
+    ('is_uptrend', '?'),
+    ('levels', 'f8', (len(LEVEL_RATIOS),)),
+    ('zone_index', 'i1'),
+    ('zone', 'U32'),
+    ('signal', 'U48'),
+    ('total_volume', 'f8'),
+    ('avg_volume', 'f8'),
+    ('max_volume', 'f8'),
+    ('recent_volume_avg', 'f8'),
+    ('earlier_volume_avg', 'f8'),
+    ('price_change', 'f8'),
+    ('volume_trend', 'U16'),
+    ('volume_signal', 'U64')
+])
+
+
+def stack_series(series):
+    """
+    Right-align many candle series into (series x candles) close/volume matrices.
+    Missing leading candles are NaN (closes) / 0 (volumes).
+    """
+    keys = [key for key, candles in series.items() if candles is not None and len(candles)]
+    columns = [_as_candles(series[key]) for key in keys]
+    lengths = np.array([len(candles) for candles in columns], dtype=np.int64)
+    width = int(lengths.max()) if len(keys) else 0
+
+    closes = np.full((len(keys), width), np.nan)
+    volumes = np.zeros((len(keys), width))
+    for row, candles in enumerate(columns):
+        closes[row, width - len(candles):] = candles.close
+        volumes[row, width - len(candles):] = candles.volume
+
+    return keys, closes, volumes, lengths
+
+
+def fibonacci_zones(current_price, swing_high, swing_low):
+    """
+    Vectorized zone logic of calculate_fibonacci_levels for arrays of series.
+    Returns (is_uptrend, zone_index) - zone_index points into UPTREND_ZONES or DOWNTREND_ZONES.
+    """
+    diff = swing_high - swing_low
+    with np.errstate(divide='ignore', invalid='ignore'):
+        price_position = np.where(diff > 0, (current_price - swing_low) / diff, 0.5)
+    is_uptrend = price_position > 0.5
+
+    # Uptrend levels hang down from the high, downtrend levels go up from the low
+    zone_levels = np.where(is_uptrend[:, None],
+                           swing_high[:, None] - diff[:, None] * ZONE_RATIOS,
+                           swing_low[:, None] + diff[:, None] * ZONE_RATIOS)
+    beyond = np.where(is_uptrend[:, None],
+                      current_price[:, None] > zone_levels,
+                      current_price[:, None] < zone_levels)
+    # First level the price is beyond, or the last zone if none
+    zone_index = np.where(beyond.any(axis=1), beyond.argmax(axis=1), len(FIB_ZONE_LEVELS))
+    return is_uptrend, zone_index
+
+
+def volume_signals(price_change, recent_volume_avg, earlier_volume_avg):
+    """
+    Vectorized volume_signal_from_averages. Returns (rising, index into VOLUME_SIGNALS).
+    """
+    rising = recent_volume_avg > earlier_volume_avg
+    falling = recent_volume_avg < earlier_volume_avg
+    signal_index = np.select(
+        [(price_change > 0) & rising, (price_change > 0) & falling,
+         (price_change < 0) & rising, (price_change < 0) & falling],
+        [0, 1, 2, 3], default=4)
+    return rising, signal_index
+
+
+def evaluate_signals_batch(series):
+    """
+    Evaluate Fibonacci and volume signals for {(pair, interval): candles} at once.
+    Returns a NumPy structured array with one row per non-empty series.
+    """
+    keys, closes, volumes, lengths = stack_series(series)
+    table = np.zeros(len(keys), dtype=RESULT_DTYPE)
+    if not keys:
+        return table
+
+    rows = np.arange(len(keys))
+    width = closes.shape[1]
+    first = width - lengths  # column of each series' first candle
+
+    # ----- Fibonacci levels and zones -----
+    current_price = closes[:, -1]
+    swing_high = np.nanmax(closes, axis=1)
+    swing_low = np.nanmin(closes, axis=1)
+    diff = swing_high - swing_low
+    is_uptrend, zone_index = fibonacci_zones(current_price, swing_high, swing_low)
+
+    levels = np.where(is_uptrend[:, None],
+                      swing_high[:, None] - diff[:, None] * LEVEL_RATIOS,
+                      swing_low[:, None] + diff[:, None] * LEVEL_RATIOS)
+    # The end levels are the swing points themselves
+    levels[:, 0] = np.where(is_uptrend, swing_high, swing_low)
+    levels[:, -1] = np.where(is_uptrend, swing_low, swing_high)
+
+    up_zones = np.array([zone for zone, signal in UPTREND_ZONES])
+    up_signals = np.array([signal for zone, signal in UPTREND_ZONES])
+    down_zones = np.array([zone for zone, signal in DOWNTREND_ZONES])
+    down_signals = np.array([signal for zone, signal in DOWNTREND_ZONES])
+
+    # ----- Volume statistics and signals -----
+    total_volume = volumes.sum(axis=1)
+    max_volume = np.where(np.isnan(closes), -np.inf, volumes).max(axis=1)
+
+    # First/last 6 candles of each series (fewer if the series is shorter)
+    offsets = np.arange(VOLUME_TREND_CANDLES)
+    earlier_columns = first[:, None] + offsets
+    earlier_mask = offsets < lengths[:, None]
+    earlier = volumes[rows[:, None], np.minimum(earlier_columns, width - 1)] * earlier_mask
+    recent = volumes[:, -VOLUME_TREND_CANDLES:]
+    recent_volume_avg = recent.sum(axis=1) / VOLUME_TREND_CANDLES
+    earlier_volume_avg = earlier.sum(axis=1) / VOLUME_TREND_CANDLES
+
+    price_change = current_price - closes[rows, first]
+    rising, volume_signal_index = volume_signals(price_change, recent_volume_avg, earlier_volume_avg)
+
+    # ----- Fill the result table -----
+    table['pair'] = [pair for pair, interval in keys]
+    table['interval'] = [interval for pair, interval in keys]
+    table['candles'] = lengths
+    table['current_price'] = current_price
+    table['swing_high'] = swing_high
+    table['swing_low'] = swing_low
+    table['is_uptrend'] = is_uptrend
+    table['levels'] = levels
+    table['zone_index'] = zone_index
+    table['zone'] = np.where(is_uptrend, up_zones[zone_index], down_zones[zone_index])
+    table['signal'] = np.where(is_uptrend, up_signals[zone_index], down_signals[zone_index])
+    table['total_volume'] = total_volume
+    table['avg_volume'] = total_volume / lengths
+    table['max_volume'] = max_volume
+    table['recent_volume_avg'] = recent_volume_avg
+    table['earlier_volume_avg'] = earlier_volume_avg
+    table['price_change'] = price_change
+    table['volume_trend'] = np.where(rising, VOLUME_TRENDS[0], VOLUME_TRENDS[1])
+    table['volume_signal'] = np.array(VOLUME_SIGNALS)[volume_signal_index]
+    return table
+
+
+def scan_signals(trading_pairs=None, intervals=None, num_candles=24):
+    """
+    Fetch every (pair, interval) concurrently and evaluate all signals in one pass
+    """
+    if intervals is None:
+        intervals = list(INTERVALS.values())
+    all_data = fetch_multiple_prices(trading_pairs, intervals, num_candles)
+    series = {(pair, interval): candles
+              for pair, by_interval in all_data.items()
+              for interval, candles in by_interval.items()}
+    return evaluate_signals_batch(series)
@@ -0,0 +1,278 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import kraken_btc_tracker as tracker
+
+# ===== BENCHMARK SUITE =====
+# Replays OHLC payloads of several sizes from a local stub server and times
+# each stage of the pipeline separately. Results are written as JSON so runs
+# from different versions can be compared (--compare).
+#
+#   python kraken_bench.py --output bench.json
+#   python kraken_bench.py --compare bench.json
+#   python kraken_bench.py --record        # save real Kraken payloads as fixtures
+
+# Payload sizes (candles) to benchmark
+BENCH_SIZES = [24, 720, 100000]
+
+# Recorded payloads live here as <name>.json (Kraken OHLC responses)
+FIXTURE_DIR = 'bench_fixtures'
+
+# Pair/interval used when recording fixtures from Kraken
+RECORD_PAIR = 'XXBTZUSD'
+RECORD_INTERVALS = [1, 60]
+
+
+# ----- Fixtures -----
+
+def synthetic_candles(num_candles, interval=1, seed=42):
+    """
+    Random-walk candles in Kraken's raw format (prices/volumes as strings)
+    """
+    rng = random.Random(seed)
+    step = interval * 60
+    start = 1700000000 // step * step - num_candles * step
+    price = 30000.0
+    rows = []
+    for i in range(num_candles):
+        open_price = price
+        close_price = price * (1 + rng.uniform(-0.002, 0.002))
+        high = max(open_price, close_price) * (1 + rng.uniform(0, 0.001))
+        low = min(open_price, close_price) * (1 - rng.uniform(0, 0.001))
+        volume = rng.uniform(0.1, 50)
+        rows.append([start + i * step, f"{open_price:.1f}", f"{high:.1f}", f"{low:.1f}",
+                     f"{close_price:.1f}", f"{(open_price + close_price) / 2:.1f}",
+                     f"{volume:.8f}", rng.randint(1, 500)])
+        price = close_price
+    return rows
+
+
+def load_recorded_candles(fixture_dir=FIXTURE_DIR):
+    """
+    All recorded candles from fixture_dir (longest recording first), or None
+    """
+    if not os.path.isdir(fixture_dir):
+        return None
+    recordings = []
+    for name in sorted(os.listdir(fixture_dir)):
+        if name.endswith('.json'):
+            with open(os.path.join(fixture_dir, name)) as f:
+                result = json.load(f)['result']
+            recordings.extend(rows for key, rows in result.items() if key != 'last')
+    return max(recordings, key=len) if recordings else None
+
+
+def build_payload(pair, num_candles, recorded=None):
+    """
+    Kraken OHLC response with num_candles candles. Recorded candles are tiled
+    (with shifted timestamps) when the recording is shorter than requested.
+    """
+    if recorded:
+        step = recorded[1][0] - recorded[0][0] if len(recorded) > 1 else 60
+        rows = [list(recorded[i % len(recorded)]) for i in range(num_candles)]
+        for i, row in enumerate(rows):
+            row[0] = recorded[0][0] + i * step
+    else:
+        rows = synthetic_candles(num_candles)
+    body = {'error': [], 'result': {pair: rows, 'last': rows[-2][0] if len(rows) > 1 else 0}}
+    return json.dumps(body).encode()
+
+
+def record_fixtures(fixture_dir=FIXTURE_DIR):
+    """
+    Save real Kraken OHLC responses as fixtures
+    """
+    os.makedirs(fixture_dir, exist_ok=True)
+    for interval in RECORD_INTERVALS:
+        data = tracker.public_request('OHLC', {'pair': RECORD_PAIR, 'interval': interval})
+        path = os.path.join(fixture_dir, f"{RECORD_PAIR}_{interval}.json")
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        print(f"✓ Recorded {path}")
+
+
+# ----- Stub server -----
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        pair = parse_qs(url.query).get('pair', [''])[0]
+        payload = self.server.payloads.get(pair) if url.path.endswith('/OHLC') else None
+        if payload is None:
+            payload = json.dumps({'error': ['EQuery:Unknown asset pair'], 'result': {}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+def start_stub_server(payloads):
+    """
+    Serve {pair: payload bytes} at http://127.0.0.1:<port>/0/public/OHLC.
+    Returns (server, base_url).
+    """
+    server = StubServer(('127.0.0.1', 0), StubHandler)
+    server.payloads = payloads
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/0/public"
+
+
+# ----- Timing -----
+
+def time_stage(func, repeat):
+    """
+    Run func `repeat` times; return timing stats in milliseconds
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'min_ms': min(samples),
+        'median_ms': statistics.median(samples),
+        'mean_ms': statistics.fmean(samples),
+        'repeat': repeat
+    }
+
+
+def run_benchmarks(sizes=BENCH_SIZES, repeat=5, render=True, fixture_dir=FIXTURE_DIR):
+    recorded = load_recorded_candles(fixture_dir)
+    pairs = {size: f"BENCH{size}" for size in sizes}
+    payloads = {pair: build_payload(pair, size, recorded) for size, pair in pairs.items()}
+    server, base_url = start_stub_server(payloads)
+
+    # Point the tracker at the stub, without rate-limit pacing
+    original = (tracker.BASE_URL, tracker.scheduler)
+    tracker.BASE_URL = base_url
+    tracker.scheduler = tracker.RequestScheduler(rate=1e9, burst=1e9)
+
+    results = {}
+    try:
+        for size, pair in pairs.items():
+            url = f"{base_url}/OHLC"
+            params = {'pair': pair, 'interval': 1}
+            raw = tracker.get_session().get(url, params=params).content
+            data = tracker.json_loads(raw)
+            rows = data['result'][pair]
+            candles = tracker.Candles.from_ohlc(rows)
+            fib_data = tracker.calculate_fibonacci_levels(candles, verbose=False)
+            volume_data = tracker.analyze_volume(candles, verbose=False)
+
+            def end_to_end():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    tracker.get_24h_btc_prices(pair, 1, size, use_cache=False)
+
+            stages = {
+                'fetch': lambda: tracker.get_session().get(url, params=params).content,
+                'json_parse': lambda: tracker.json_loads(raw),
+                'decode_last_24': lambda: tracker.decode_ohlc(raw, pair, 24),
+                'candle_construction': lambda: tracker.Candles.from_ohlc(rows[-size:]),
+                'calculate_fibonacci_levels': lambda: tracker.calculate_fibonacci_levels(candles, verbose=False),
+                'analyze_volume': lambda: tracker.analyze_volume(candles, verbose=False),
+                'get_24h_btc_prices': end_to_end
+            }
+            if render:
+                stages['plot_price_and_volume'] = lambda: tracker.plot_price_and_volume(
+                    candles, fib_data, volume_data, output='png')
+                stages['analyze_and_plot_24h'] = lambda: tracker.analyze_and_plot_24h(
+                    candles, fib_data, output='png', verbose=False)
+
+            results[str(size)] = {
+                'payload_bytes': len(raw),
+                'stages': {name: time_stage(func, repeat) for name, func in stages.items()}
+            }
+            print(f"✓ Benchmarked {size} candles")
+    finally:
+        tracker.BASE_URL, tracker.scheduler = original
+        server.shutdown()
+        server.server_close()
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'json_backend': tracker.JSON_BACKEND,
+            'fixtures': 'recorded' if recorded else 'synthetic'
+        },
+        'results': results
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_report(report, baseline=None):
+    print("\n" + "="*78)
+    print(f"⏱️  BENCHMARK RESULTS ({report['meta']['fixtures']} fixtures, commit {report['meta']['git_commit']})")
+    print("="*78)
+    for size, result in report['results'].items():
+        print(f"\n{size} candles ({result['payload_bytes']:,} bytes)")
+        print("-" * 78)
+        for stage, timing in result['stages'].items():
+            line = f"  {stage:28s} {timing['median_ms']:10.3f} ms (min {timing['min_ms']:.3f})"
+            if baseline:
+                old = baseline['results'].get(size, {}).get('stages', {}).get(stage)
+                if old and old['median_ms'] > 0:
+                    line += f"   x{timing['median_ms'] / old['median_ms']:.2f} vs baseline"
+            print(line)
+    print("="*78 + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Kraken Tracker Benchmarks')
+    parser.add_argument('--sizes', type=int, nargs='+', default=BENCH_SIZES,
+                        help='Payload sizes in candles')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Runs per stage')
+    parser.add_argument('--no-render', action='store_true',
+                        help='Skip the chart rendering stages')
+    parser.add_argument('--fixtures', type=str, default=FIXTURE_DIR,
+                        help='Folder with recorded OHLC payloads')
+    parser.add_argument('--record', action='store_true',
+                        help='Record real Kraken payloads into the fixture folder and exit')
+    parser.add_argument('--output', type=str,
+                        help='Write results as JSON to this file')
+    parser.add_argument('--compare', type=str,
+                        help='Baseline JSON results to compare against')
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(args.fixtures)
+    else:
+        report = run_benchmarks(args.sizes, args.repeat, not args.no_render, args.fixtures)
+        baseline = None
+        if args.compare:
+            with open(args.compare) as f:
+                baseline = json.load(f)
+        print_report(report, baseline)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"✓ Results written to {args.output}")
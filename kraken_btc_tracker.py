@@ -1,26 +1,56 @@
 import requests
-import matplotlib.pyplot as plt
+from requests.adapters import HTTPAdapter
+import numpy as np
 from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+import io
+import json
 import os
-from dotenv import load_dotenv
+import random
+import re
+import threading
+import time
 
-# Load environment variables from .env file
-load_dotenv()
+import kraken_metrics as metrics
+
+# Optional faster JSON parser (pip install orjson) - falls back to the standard library
+try:
+    import orjson
+    json_loads = orjson.loads
+    JSON_BACKEND = 'orjson'
+except ImportError:
+    json_loads = json.loads
+    JSON_BACKEND = 'json'
 
 # Kraken API Configuration
 BASE_URL = "https://api.kraken.com/0/public"
 
-# API Keys - Loaded from .env file for security
+# API Keys - from the environment, or a .env file once load_api_keys() has run
 # These are only needed for private endpoints (trading, balance checking, etc.)
 API_KEY = os.getenv('KRAKEN_API_KEY', '')
 API_SECRET = os.getenv('KRAKEN_API_SECRET', '')
 
-# Check if API keys are loaded (optional - only needed for private endpoints)
-if API_KEY and API_SECRET:
-    print("✓ API Keys loaded successfully")
-else:
-    print("ℹ️  No API keys found (not needed for public data)")
-    print("   To add keys: Create a .env file with KRAKEN_API_KEY and KRAKEN_API_SECRET")
+
+def load_api_keys(verbose=True):
+    """
+    Load KRAKEN_API_KEY / KRAKEN_API_SECRET from the .env file into API_KEY / API_SECRET.
+    Not done at import time, so importing this module stays fast and silent.
+    """
+    global API_KEY, API_SECRET
+    from dotenv import load_dotenv
+    load_dotenv()
+    API_KEY = os.getenv('KRAKEN_API_KEY', '')
+    API_SECRET = os.getenv('KRAKEN_API_SECRET', '')
+    
+    # Check if API keys are loaded (optional - only needed for private endpoints)
+    if verbose:
+        if API_KEY and API_SECRET:
+            print("✓ API Keys loaded successfully")
+        else:
+            print("ℹ️  No API keys found (not needed for public data)")
+            print("   To add keys: Create a .env file with KRAKEN_API_KEY and KRAKEN_API_SECRET")
+    return API_KEY, API_SECRET
+
 
 # Trading Pairs (Kraken notation)
 TRADING_PAIRS = {
@@ -47,10 +77,606 @@ INTERVALS = {
     '15days': 21600
 }
 
+# Fibonacci levels that split the range into price zones
+FIB_ZONE_LEVELS = ['23.6%', '38.2%', '50.0%', '61.8%']
+
+# (zone, signal) for each zone - uptrend zones from the top down, downtrend zones from the bottom up
+UPTREND_ZONES = [
+    ("Above 23.6%", "STRONG - Consider taking profits"),
+    ("Between 23.6% and 38.2%", "HOLD - Watch for reversal"),
+    ("Between 38.2% and 50%", "BUY ZONE - Good entry point"),
+    ("Between 50% and 61.8%", "STRONG BUY - Golden ratio support"),
+    ("Below 61.8%", "WAIT - Possible trend reversal")
+]
+DOWNTREND_ZONES = [
+    ("Below 23.6%", "STRONG SELL - Consider exit"),
+    ("Between 23.6% and 38.2%", "HOLD - Watch for bounce"),
+    ("Between 38.2% and 50%", "SELL ZONE - Consider reducing position"),
+    ("Between 50% and 61.8%", "CAUTION - Near golden ratio resistance"),
+    ("Above 61.8%", "WAIT - Possible trend change")
+]
+
+# Volume trend labels (increasing, decreasing)
+VOLUME_TRENDS = ["INCREASING 📈", "DECREASING 📉"]
+
+# Volume-price signals: up+rising volume, up+falling, down+rising, down+falling, stable
+VOLUME_SIGNALS = [
+    "BULLISH - Price up with increasing volume",
+    "CAUTION - Price up but volume decreasing (weak rally)",
+    "BEARISH - Price down with increasing volume",
+    "NEUTRAL - Price down but volume decreasing (weak sell-off)",
+    "NEUTRAL - Price stable"
+]
+
+# All Fibonacci signals, numbered: uptrend zones, then downtrend zones
+FIB_SIGNALS = [signal for zone, signal in UPTREND_ZONES] + [signal for zone, signal in DOWNTREND_ZONES]
+
+# Expected price direction for each signal (+1 up, -1 down, 0 no call), same order as FIB_SIGNALS
+FIB_SIGNAL_DIRECTIONS = [
+    -1, 0, 1, 1, 0,   # uptrend: taking profits, hold, buy zone, strong buy, wait
+    -1, 0, -1, -1, 0  # downtrend: strong sell, hold, sell zone, near resistance, wait
+]
+# Same for VOLUME_SIGNALS: up+rising volume, up+falling (weak rally), down+rising, down+falling (weak sell-off), stable
+VOLUME_SIGNAL_DIRECTIONS = [1, -1, -1, 0, 0]
+
+# HTTP connection pool size (max keep-alive connections kept open to Kraken)
+HTTP_POOL_SIZE = 16
+
+# Shared HTTP session - reuses TCP+TLS connections across requests
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Return the shared keep-alive HTTP session (created on first use)
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE,
+                                      pool_maxsize=HTTP_POOL_SIZE)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+# Kraken public API pacing: sustained requests per second and burst size
+PUBLIC_RATE_LIMIT = 1.0
+PUBLIC_RATE_BURST = 15
+
+# Backoff after Kraken throttles us (seconds, doubles on each throttle)
+THROTTLE_BACKOFF_MIN = 1.0
+THROTTLE_BACKOFF_MAX = 60.0
+THROTTLE_MAX_RETRIES = 3
+
+# Kraken error codes that mean "slow down"
+THROTTLE_ERRORS = ('EAPI:Rate limit exceeded', 'EGeneral:Too many requests', 'EService:Throttled')
 
-def get_24h_btc_prices(trading_pair='XXBTZUSD', interval=60, num_candles=24):
-    # OHLC endpoint for getting candlestick data
-    endpoint = f"{BASE_URL}/OHLC"
+# Seconds to wait for Kraken: (connecting, each read of the response)
+REQUEST_TIMEOUT = (5, 15)
+
+# Retries after connection errors, timeouts and 5xx responses, with a random
+# ("full jitter") wait of up to base * 2^attempt seconds, capped at the max
+RETRY_MAX = 3
+RETRY_BACKOFF_BASE = 0.5
+RETRY_BACKOFF_MAX = 8.0
+
+# Circuit breaker: failures in a row that open an endpoint's circuit, and
+# seconds it stays open before one trial request may close it again
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 30.0
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """
+    Raised instead of calling an endpoint whose circuit is open
+    """
+
+
+class CircuitBreaker:
+    """
+    Stops calling an endpoint that keeps failing: after failure_threshold
+    failures in a row the circuit opens and calls fail fast for reset_timeout
+    seconds, then a single trial call decides whether it closes again
+    """
+    
+    def __init__(self, endpoint, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False  # a half-open trial call is running
+    
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return 'open'
+            return 'half-open'
+    
+    def allow(self):
+        """
+        May a call go through now? (Claims the trial call when half-open.)
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._trial = True
+            return True
+    
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+    
+    def release(self):
+        """
+        End a trial call that neither failed nor succeeded (e.g. interrupted with Ctrl+C)
+        """
+        with self._lock:
+            self._trial = False
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            # A failed trial reopens the circuit straight away
+            if self._trial or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                self._trial = False
+                opened = True
+            else:
+                opened = False
+        if opened:
+            print(f"⚠️  {self.endpoint}: {self._failures} failures in a row - pausing calls for {self.reset_timeout:.0f}s")
+            metrics.inc('kraken_circuit_opened_total', endpoint=self.endpoint)
+
+
+class RequestScheduler:
+    """
+    Central gate for Kraken requests: paces them with a token bucket, backs off
+    when Kraken throttles us, retries failed requests, stops calling endpoints
+    that keep failing (one circuit breaker per endpoint) and merges identical
+    concurrent requests (same URL and params) into one network call whose
+    result every caller shares.
+    """
+    
+    def __init__(self, rate=PUBLIC_RATE_LIMIT, burst=PUBLIC_RATE_BURST, max_retries=THROTTLE_MAX_RETRIES,
+                 retries=RETRY_MAX, timeout=REQUEST_TIMEOUT):
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.retries = retries
+        self.timeout = timeout
+        
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._backoff = 0.0
+        self._in_flight = {}  # (url, params) -> Future
+        self._breakers = {}   # endpoint -> CircuitBreaker
+    
+    def acquire(self, cost=1):
+        """
+        Reserve `cost` tokens now and sleep until they are ours (tokens may go negative)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= cost
+            wait = max(-self._tokens / self.rate, self._paused_until - now)
+        if wait > 0:
+            time.sleep(wait)
+    
+    def throttled(self):
+        """
+        Kraken asked us to slow down: pause every caller, not just the one that got throttled
+        """
+        with self._lock:
+            self._backoff = min(max(self._backoff * 2, THROTTLE_BACKOFF_MIN), THROTTLE_BACKOFF_MAX)
+            self._paused_until = time.monotonic() + self._backoff
+            self._tokens = min(self._tokens, 0.0)
+        print(f"⚠️  Kraken rate limit hit - backing off {self._backoff:.0f}s")
+        metrics.inc('kraken_http_throttled_total')
+    
+    def breaker(self, endpoint):
+        """
+        The circuit breaker of one endpoint (e.g. 'OHLC')
+        """
+        with self._lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = CircuitBreaker(endpoint)
+            return self._breakers[endpoint]
+    
+    def _retry_wait(self, endpoint, failures, error):
+        delay = random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** failures))
+        print(f"⚠️  {endpoint} request failed ({error}) - retrying in {delay:.1f}s")
+        time.sleep(delay)
+    
+    def _fetch(self, url, params, raw=False):
+        endpoint = url.rsplit('/', 1)[-1]
+        breaker = self.breaker(endpoint)
+        attempt = failures = 0
+        while True:
+            if not breaker.allow():
+                metrics.inc('kraken_circuit_rejected_total', endpoint=endpoint)
+                raise CircuitOpenError(f"{endpoint} circuit is open after repeated failures")
+            
+            self.acquire()
+            try:
+                with metrics.timer('kraken_http_request_seconds', endpoint=endpoint):
+                    response = get_session().get(url, params=params, timeout=self.timeout)
+                metrics.inc('kraken_http_requests_total', endpoint=endpoint, status=response.status_code)
+                metrics.inc('kraken_http_response_bytes_total', len(response.content), endpoint=endpoint)
+                if response.status_code >= 500:
+                    response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                # Network trouble, a broken response or a server-side error - worth another try
+                breaker.record_failure()
+                metrics.inc('kraken_http_failures_total', endpoint=endpoint)
+                if failures >= self.retries:
+                    raise
+                failures += 1
+                self._retry_wait(endpoint, failures, e)
+                continue
+            except Exception:
+                # Anything else still has to end a half-open trial
+                breaker.record_failure()
+                raise
+            except BaseException:
+                # Ctrl+C or shutdown says nothing about the endpoint
+                breaker.release()
+                raise
+            breaker.record_success()
+            
+            if response.status_code == 429 and attempt < self.max_retries:
+                attempt += 1
+                self.throttled()
+                continue
+            response.raise_for_status()
+            
+            if raw:
+                # Caller decodes the body itself - only look for throttle codes
+                data = response.content
+                throttled = any(code.encode() in data for code in THROTTLE_ERRORS)
+                ok = _EMPTY_ERROR.match(data) is not None
+            else:
+                with metrics.timer('kraken_json_parse_seconds', endpoint=endpoint):
+                    data = json_loads(response.content)
+                errors = data.get('error') or []
+                throttled = any(error.startswith(THROTTLE_ERRORS) for error in errors)
+                ok = not errors
+            if throttled and attempt < self.max_retries:
+                attempt += 1
+                self.throttled()
+                continue
+            
+            if ok:
+                with self._lock:
+                    self._backoff = 0.0
+            return data
+    
+    def get(self, url, params=None, raw=False):
+        """
+        GET a Kraken endpoint and return the parsed JSON (or the undecoded
+        response body with raw=True).
+        The result may be shared with other callers - don't modify it.
+        """
+        key = (url, tuple(sorted((params or {}).items())), raw)
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._in_flight[key] = future
+        
+        # Someone is already fetching exactly this - wait for their result
+        if not is_owner:
+            metrics.inc('kraken_requests_coalesced_total')
+            return future.result()
+        
+        try:
+            data = self._fetch(url, params, raw)
+            future.set_result(data)
+            return data
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+
+# Shared scheduler for all public endpoint calls
+scheduler = RequestScheduler()
+
+
+def public_request(method, params=None, raw=False):
+    """
+    Call a Kraken public endpoint (e.g. 'OHLC') through the shared scheduler
+    """
+    return scheduler.get(f"{BASE_URL}/{method}", params, raw)
+
+
+# A response body that starts with an empty error list, and the OHLC 'last' cursor
+_EMPTY_ERROR = re.compile(rb'\s*\{\s*"error"\s*:\s*\[\s*\]')
+_LAST_CURSOR = re.compile(rb'"last"\s*:\s*(\d+)')
+
+
+def _pair_result(result, trading_pair):
+    # Kraken may answer with its own name for the pair (e.g. XXBTZUSD for XBTUSD)
+    if trading_pair in result:
+        return result[trading_pair]
+    return next(value for key, value in result.items() if key != 'last')
+
+
+def decode_ohlc(payload, trading_pair, num_candles=None):
+    """
+    Decode a raw OHLC response body into (errors, rows, last).
+    
+    With num_candles only the last N rows are decoded: they are cut out of the
+    raw bytes (candle rows are flat arrays of numbers and strings, so the row
+    starts can be found by scanning back for '[') and only that slice is parsed.
+    Anything unexpected falls back to parsing the whole body.
+    """
+    if num_candles is not None and _EMPTY_ERROR.match(payload):
+        key = payload.find(b'"' + trading_pair.encode() + b'":')
+        start = payload.find(b'[', key) if key >= 0 else -1
+        # Closing bracket of the last row; the candle array ends right after it
+        close = payload.rfind(b']]')
+        if 0 <= start < close:
+            pos = payload.rfind(b'[', start + 1, close)
+            for _ in range(num_candles - 1):
+                row = payload.rfind(b'[', start + 1, pos)
+                if row < 0:
+                    break
+                pos = row
+            last = _LAST_CURSOR.search(payload, close) or _LAST_CURSOR.search(payload, 0, key)
+            with metrics.timer('kraken_json_parse_seconds', endpoint='OHLC'):
+                rows = json_loads(b'[' + payload[pos:close + 2])[-num_candles:] if num_candles > 0 else []
+            return [], rows, int(last.group(1)) if last else None
+    
+    with metrics.timer('kraken_json_parse_seconds', endpoint='OHLC'):
+        data = json_loads(payload)
+    if data.get('error'):
+        return data['error'], [], None
+    result = data['result']
+    rows = _pair_result(result, trading_pair)
+    if num_candles is not None:
+        rows = rows[-num_candles:] if num_candles > 0 else []
+    return [], rows, result.get('last')
+
+
+# Max candles kept per (pair, interval) in the local cache (Kraken returns up to 720)
+CANDLE_CACHE_SIZE = 720
+
+# Local candle cache: (pair, interval) -> {'candles': [raw OHLC rows], 'last': since cursor}
+_candle_cache = {}
+_candle_cache_lock = threading.Lock()
+
+
+def _merge_candles(trading_pair, interval, new_candles, last, num_candles=CANDLE_CACHE_SIZE):
+    """
+    Merge freshly fetched OHLC rows into the cache and return the last num_candles cached rows
+    """
+    key = (trading_pair, interval)
+    with _candle_cache_lock:
+        cached = _candle_cache.get(key)
+        candles = cached['candles'] if cached else []
+        
+        if new_candles:
+            first_time = new_candles[0][0]
+            # A gap between the cached and the new rows means the cursor was too old
+            # for Kraken's window - start over with just the new rows
+            if candles and first_time > candles[-1][0] + interval * 60:
+                candles = []
+            # Drop cached rows the new ones replace (incl. the still-forming last candle)
+            while candles and candles[-1][0] >= first_time:
+                candles.pop()
+            candles.extend(new_candles)
+            if len(candles) > CANDLE_CACHE_SIZE:
+                del candles[:-CANDLE_CACHE_SIZE]
+        
+        _candle_cache[key] = {
+            'candles': candles,
+            'last': last if last is not None else (cached['last'] if cached else None)
+        }
+        return candles[-num_candles:] if num_candles > 0 else []
+
+
+def clear_candle_cache():
+    """
+    Forget all cached candles (the next fetch downloads the full window again)
+    """
+    with _candle_cache_lock:
+        _candle_cache.clear()
+
+
+class Candles:
+    """
+    Columnar candle container - one contiguous NumPy array per OHLC field.
+    Time strings are only formatted when asked for.
+    """
+    
+    FIELDS = ('time', 'open', 'high', 'low', 'close', 'vwap', 'volume', 'count')
+    
+    def __init__(self, time, open, high, low, close, vwap=None, volume=None, count=None):
+        self.time = np.ascontiguousarray(time, dtype=np.int64)
+        self.open = np.ascontiguousarray(open, dtype=np.float64)
+        self.high = np.ascontiguousarray(high, dtype=np.float64)
+        self.low = np.ascontiguousarray(low, dtype=np.float64)
+        self.close = np.ascontiguousarray(close, dtype=np.float64)
+        n = len(self.time)
+        self.vwap = np.ascontiguousarray(self.close if vwap is None else vwap, dtype=np.float64)
+        self.volume = np.ascontiguousarray(np.zeros(n) if volume is None else volume, dtype=np.float64)
+        self.count = np.ascontiguousarray(np.zeros(n) if count is None else count, dtype=np.int64)
+        self._times = None
+        # Set by stale-while-revalidate fetches: unix time of the download, and
+        # whether these are older candles served because a fresh fetch failed
+        self.fetched_at = None
+        self.stale = False
+    
+    @classmethod
+    def empty(cls):
+        return cls(*([[]] * 8))
+    
+    @classmethod
+    def from_ohlc(cls, ohlc_data):
+        """
+        Build from raw Kraken rows: [time, open, high, low, close, vwap, volume, count]
+        """
+        if not ohlc_data:
+            return cls.empty()
+        # Transpose rows into columns once, then bulk-convert each column
+        # (the six price/volume string columns in a single call)
+        columns = list(zip(*ohlc_data))
+        values = np.array(columns[1:7], dtype=np.float64)
+        return cls(np.array(columns[0], dtype=np.int64), *values,
+                   np.array(columns[7], dtype=np.int64))
+    
+    @classmethod
+    def from_dicts(cls, candle_list):
+        """
+        Build from the old list-of-dicts format ('timestamp', 'open', ..., 'price', 'volume')
+        """
+        if not candle_list:
+            return cls.empty()
+        return cls([c['timestamp'] for c in candle_list],
+                   [c['open'] for c in candle_list],
+                   [c['high'] for c in candle_list],
+                   [c['low'] for c in candle_list],
+                   [c['price'] for c in candle_list],
+                   [c.get('vwap', c['price']) for c in candle_list],
+                   [c.get('volume', 0.0) for c in candle_list],
+                   [c.get('count', 0) for c in candle_list])
+    
+    @classmethod
+    def concat(cls, parts):
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return cls.empty()
+        return cls(*(np.concatenate([getattr(part, field) for part in parts]) for field in cls.FIELDS))
+    
+    def __len__(self):
+        return len(self.time)
+    
+    def __getitem__(self, index):
+        # Slices stay columnar, single items come back in the old dict format
+        if isinstance(index, slice):
+            return Candles(*(getattr(self, field)[index] for field in self.FIELDS))
+        return {
+            'timestamp': int(self.time[index]),
+            'time': self.time_str(index),
+            'open': float(self.open[index]),
+            'high': float(self.high[index]),
+            'low': float(self.low[index]),
+            'price': float(self.close[index]),
+            'volume': float(self.volume[index])
+        }
+    
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+    
+    def __repr__(self):
+        return f"Candles({len(self)} candles)"
+    
+    def time_str(self, index):
+        return datetime.fromtimestamp(int(self.time[index])).strftime('%Y-%m-%d %H:%M')
+    
+    @property
+    def times(self):
+        # Formatted once, on first use
+        if self._times is None:
+            self._times = [datetime.fromtimestamp(t).strftime('%Y-%m-%d %H:%M')
+                           for t in self.time.tolist()]
+        return self._times
+    
+    def to_dicts(self):
+        return list(self)
+
+
+def _as_candles(candle_data):
+    """
+    Accept either a Candles container or the old list-of-dicts format
+    """
+    if isinstance(candle_data, Candles):
+        return candle_data
+    return Candles.from_dicts(candle_data)
+
+
+def _merge_buckets(candles, starts):
+    """
+    Merge runs of candles into one candle each (runs begin at the `starts` indices):
+    first open, max high, min low, last close, summed volume/count, volume-weighted vwap
+    """
+    ends = np.append(starts[1:], len(candles)) - 1
+    
+    volume = np.add.reduceat(candles.volume, starts)
+    weighted = np.add.reduceat(candles.vwap * candles.volume, starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vwap = np.where(volume > 0, weighted / volume, candles.close[ends])
+    
+    return Candles(candles.time[starts],
+                   candles.open[starts],
+                   np.maximum.reduceat(candles.high, starts),
+                   np.minimum.reduceat(candles.low, starts),
+                   candles.close[ends],
+                   vwap,
+                   volume,
+                   np.add.reduceat(candles.count, starts))
+
+
+def resample_candles(candles, interval, drop_partial_first=True):
+    """
+    Build coarser candles (interval in minutes) from finer ones, e.g. 1-hour from 1-minute.
+    Buckets start on multiples of the interval since the Unix epoch, like Kraken's.
+    The last bucket may still be forming, just like Kraken's last candle.
+    """
+    candles = _as_candles(candles)
+    if not len(candles):
+        return candles
+    
+    step = interval * 60
+    bucket = candles.time // step * step
+    starts = np.flatnonzero(np.diff(bucket, prepend=bucket[0] - 1))
+    resampled = _merge_buckets(candles, starts)
+    resampled.time[:] = bucket[starts]
+    
+    # The first bucket is incomplete if the data starts in the middle of it
+    if drop_partial_first and candles.time[0] != bucket[0]:
+        resampled = resampled[1:]
+    return resampled
+
+
+def resample_all(candles, intervals=None):
+    """
+    Derive every interval at once from one base series. Returns {interval: candles}
+    """
+    if intervals is None:
+        intervals = list(INTERVALS.values())
+    candles = _as_candles(candles)
+    return {interval: resample_candles(candles, interval) for interval in intervals}
+
+
+def get_24h_btc_prices(trading_pair='XXBTZUSD', interval=60, num_candles=24, use_cache=True,
+                       stale_while_revalidate=False):
+    # Resilient mode: never wait long, fall back to the last good candles
+    if stale_while_revalidate:
+        return _get_candles_swr(trading_pair, interval, num_candles, use_cache)
     
     # Parameters for the API request
     params = {
@@ -58,68 +684,149 @@ def get_24h_btc_prices(trading_pair='XXBTZUSD', interval=60, num_candles=24):
         'interval': interval
     }
     
+    # After the first load only ask for candles newer than the stored cursor
+    if use_cache:
+        cached = _candle_cache.get((trading_pair, interval))
+        if cached and cached['last'] is not None:
+            params['since'] = cached['last']
+            metrics.inc('kraken_candle_cache_hits_total')
+        else:
+            metrics.inc('kraken_candle_cache_misses_total')
+    
     try:
-        # Make the API request
-        response = requests.get(endpoint, params=params)
-        response.raise_for_status()  # Raise an error for bad status codes
+        # Make the API request (OHLC endpoint for getting candlestick data)
+        # Paced and de-duplicated by the shared scheduler; raises on bad status codes
+        payload = public_request('OHLC', params, raw=True)
         
-        # Parse the JSON response
-        data = response.json()
+        # Decode the OHLC rows - without the cache only the last N are needed
+        # The data structure is: [timestamp, open, high, low, close, vwap, volume, count]
+        errors, ohlc_data, last = decode_ohlc(payload, trading_pair, None if use_cache else num_candles)
         
         # Check if the request was successful
-        if data['error']:
-            print(f"API Error: {data['error']}")
+        if errors:
+            print(f"API Error: {errors}")
             return []
         
-        # Extract the OHLC data
-        # The data structure is: [timestamp, open, high, low, close, vwap, volume, count]
-        ohlc_data = data['result'][trading_pair]
-        
-        # Get the last N hours of closing prices and volume
-        # Each item in ohlc_data is: [time, open, high, low, close, vwap, volume, count]
-        btc_24h_list = []
+        # Merge the new candles into the local cache
+        if use_cache:
+            ohlc_data = _merge_candles(trading_pair, interval, ohlc_data, last, num_candles)
         
-        for candle in ohlc_data[-num_candles:]:  # Get last N candles
-            timestamp = candle[0]
-            open_price = float(candle[1])   # Opening price
-            high_price = float(candle[2])   # High price
-            low_price = float(candle[3])    # Low price
-            close_price = float(candle[4])  # Closing price
-            volume = float(candle[6])       # Volume in BTC
-            
-            # Convert timestamp to readable format
-            time_str = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M')
-            
-            btc_24h_list.append({
-                'timestamp': timestamp,
-                'time': time_str,
-                'open': open_price,
-                'high': high_price,
-                'low': low_price,
-                'price': close_price,
-                'volume': volume
-            })
+        # Get the last N candles as columns
+        with metrics.timer('kraken_candle_build_seconds'):
+            btc_24h_list = Candles.from_ohlc(ohlc_data)
+        metrics.inc('kraken_candles_processed_total', len(btc_24h_list))
         
         print(f"✓ Successfully fetched {len(btc_24h_list)} candles of {trading_pair} data")
         return btc_24h_list
     
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, ValueError) as e:
+        # ValueError: a body that is not valid JSON
         print(f"Error fetching data: {e}")
         return []
 
 
-def calculate_fibonacci_levels(btc_24h_list):
-    if not btc_24h_list:
-        print("No data to calculate Fibonacci levels!")
-        return None
+# Seconds a stale-while-revalidate fetch waits for fresh candles before
+# answering with the last good ones (the refresh keeps running)
+SWR_WAIT = 2.0
+
+# Background refreshes running at the same time
+SWR_MAX_REFRESHES = 8
+
+# Last good candles and running refreshes per (pair, interval, num_candles)
+_last_good = {}
+_swr_refreshes = {}
+_swr_lock = threading.Lock()
+_swr_executor = None
+
+
+def _refresh_executor():
+    global _swr_executor
+    with _swr_lock:
+        if _swr_executor is None:
+            _swr_executor = ThreadPoolExecutor(max_workers=SWR_MAX_REFRESHES, thread_name_prefix='kraken-refresh')
+        return _swr_executor
+
+
+def _swr_refresh(key, use_cache):
+    # Runs in the background: one fetch, remembered if it worked
+    try:
+        candles = get_24h_btc_prices(*key, use_cache=use_cache)
+        if candles:
+            candles.fetched_at = time.time()
+            with _swr_lock:
+                _last_good[key] = candles
+        return candles
+    finally:
+        with _swr_lock:
+            del _swr_refreshes[key]
+
+
+def _get_candles_swr(trading_pair, interval, num_candles, use_cache):
+    """
+    Stale-while-revalidate: start (or join) a background refresh and wait at
+    most SWR_WAIT seconds for it. If it is slow or fails, return the last good
+    candles with stale=True. Only the very first fetch has nothing to fall back
+    on and waits for the refresh.
+    """
+    key = (trading_pair, interval, num_candles)
+    with _swr_lock:
+        last_good = _last_good.get(key)
+        future = _swr_refreshes.get(key)
+    if future is None:
+        executor = _refresh_executor()
+        with _swr_lock:
+            future = _swr_refreshes.get(key)
+            if future is None:
+                future = _swr_refreshes[key] = executor.submit(_swr_refresh, key, use_cache)
     
-    prices = [item['price'] for item in btc_24h_list]
-    current_price = prices[-1]
+    if last_good is None:
+        return future.result()
     
-    # Find swing high and swing low (highest and lowest points in 24h)
-    swing_high = max(prices)
-    swing_low = min(prices)
+    try:
+        candles = future.result(timeout=SWR_WAIT)
+    except Exception:
+        candles = None
+    if candles:
+        return candles
     
+    # Same arrays, marked as old
+    stale = last_good[:]
+    stale.fetched_at = last_good.fetched_at
+    stale.stale = True
+    metrics.inc('kraken_stale_responses_total')
+    print(f"⚠️  Serving {len(stale)} stale candles of {trading_pair} "
+          f"from {datetime.fromtimestamp(stale.fetched_at).strftime('%H:%M:%S')}")
+    return stale
+
+
+def fetch_multiple_prices(trading_pairs=None, intervals=None, num_candles=24, max_workers=8):
+    """
+    Fetch OHLC data for many (pair, interval) combinations concurrently.
+    Returns {pair: {interval: candles}}
+    """
+    if trading_pairs is None:
+        trading_pairs = list(TRADING_PAIRS.values())
+    if intervals is None:
+        intervals = [INTERVALS['1hour']]
+    
+    jobs = [(pair, interval) for pair in trading_pairs for interval in intervals]
+    
+    # All requests run at the same time over the shared connection pool,
+    # so a full sweep takes as long as the slowest request
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs)))) as executor:
+        results = executor.map(lambda job: get_24h_btc_prices(job[0], job[1], num_candles), jobs)
+        
+        all_data = {pair: {} for pair in trading_pairs}
+        for (pair, interval), candles in zip(jobs, results):
+            all_data[pair][interval] = candles
+    
+    return all_data
+
+
+def fibonacci_from_swing(current_price, swing_high, swing_low):
+    """
+    Fibonacci levels, zone and signal for a given price and swing range
+    """
     # Calculate price difference
     diff = swing_high - swing_low
     
@@ -154,59 +861,17 @@ def calculate_fibonacci_levels(btc_24h_list):
         }
     
     # Determine current price zone and trading signal
-    signal = "HOLD"
-    zone = ""
+    # (the first level the price is beyond decides the zone)
+    zone_index = len(FIB_ZONE_LEVELS)
+    for i, level in enumerate(FIB_ZONE_LEVELS):
+        if is_uptrend and current_price > fib_levels[level]:
+            zone_index = i
+            break
+        if not is_uptrend and current_price < fib_levels[level]:
+            zone_index = i
+            break
     
-    if is_uptrend:
-        if current_price > fib_levels['23.6%']:
-            zone = "Above 23.6%"
-            signal = "STRONG - Consider taking profits"
-        elif current_price > fib_levels['38.2%']:
-            zone = "Between 23.6% and 38.2%"
-            signal = "HOLD - Watch for reversal"
-        elif current_price > fib_levels['50.0%']:
-            zone = "Between 38.2% and 50%"
-            signal = "BUY ZONE - Good entry point"
-        elif current_price > fib_levels['61.8%']:
-            zone = "Between 50% and 61.8%"
-            signal = "STRONG BUY - Golden ratio support"
-        else:
-            zone = "Below 61.8%"
-            signal = "WAIT - Possible trend reversal"
-    else:
-        if current_price < fib_levels['23.6%']:
-            zone = "Below 23.6%"
-            signal = "STRONG SELL - Consider exit"
-        elif current_price < fib_levels['38.2%']:
-            zone = "Between 23.6% and 38.2%"
-            signal = "HOLD - Watch for bounce"
-        elif current_price < fib_levels['50.0%']:
-            zone = "Between 38.2% and 50%"
-            signal = "SELL ZONE - Consider reducing position"
-        elif current_price < fib_levels['61.8%']:
-            zone = "Between 50% and 61.8%"
-            signal = "CAUTION - Near golden ratio resistance"
-        else:
-            zone = "Above 61.8%"
-            signal = "WAIT - Possible trend change"
-    
-    # Print Fibonacci analysis
-    print("\n" + "="*50)
-    print("📐 FIBONACCI RETRACEMENT ANALYSIS")
-    print("="*50)
-    print(f"Trend Direction:  {'📈 UPTREND' if is_uptrend else '📉 DOWNTREND'}")
-    print(f"Swing High:       ${swing_high:,.2f}")
-    print(f"Swing Low:        ${swing_low:,.2f}")
-    print(f"Current Price:    ${current_price:,.2f}")
-    print(f"Price Zone:       {zone}")
-    print("-" * 50)
-    print("Fibonacci Levels:")
-    for level, price in fib_levels.items():
-        marker = "👉" if abs(price - current_price) < diff * 0.05 else "  "
-        print(f"{marker} {level:15s} ${price:,.2f}")
-    print("-" * 50)
-    print(f"💡 SIGNAL: {signal}")
-    print("="*50 + "\n")
+    zone, signal = (UPTREND_ZONES if is_uptrend else DOWNTREND_ZONES)[zone_index]
     
     return {
         'levels': fib_levels,
@@ -219,70 +884,124 @@ def calculate_fibonacci_levels(btc_24h_list):
     }
 
 
-def analyze_volume(btc_24h_list):
+@metrics.timed('kraken_analysis_seconds', function='calculate_fibonacci_levels')
+def calculate_fibonacci_levels(btc_24h_list, verbose=True):
     if not btc_24h_list:
-        print("No data to analyze volume!")
+        if verbose:
+            print("No data to calculate Fibonacci levels!")
         return None
     
-    volumes = [item['volume'] for item in btc_24h_list]
-    prices = [item['price'] for item in btc_24h_list]
-    times = [item['time'] for item in btc_24h_list]
+    prices = _as_candles(btc_24h_list).close
+    current_price = float(prices[-1])
+    
+    # Find swing high and swing low (highest and lowest points in 24h)
+    swing_high = float(prices.max())
+    swing_low = float(prices.min())
+    
+    fib_data = fibonacci_from_swing(current_price, swing_high, swing_low)
+    fib_levels = fib_data['levels']
+    diff = swing_high - swing_low
+    
+    # Print Fibonacci analysis
+    if verbose:
+        print("\n" + "="*50)
+        print("📐 FIBONACCI RETRACEMENT ANALYSIS")
+        print("="*50)
+        print(f"Trend Direction:  {'📈 UPTREND' if fib_data['is_uptrend'] else '📉 DOWNTREND'}")
+        print(f"Swing High:       ${swing_high:,.2f}")
+        print(f"Swing Low:        ${swing_low:,.2f}")
+        print(f"Current Price:    ${current_price:,.2f}")
+        print(f"Price Zone:       {fib_data['zone']}")
+        print("-" * 50)
+        print("Fibonacci Levels:")
+        for level, price in fib_levels.items():
+            marker = "👉" if abs(price - current_price) < diff * 0.05 else "  "
+            print(f"{marker} {level:15s} ${price:,.2f}")
+        print("-" * 50)
+        print(f"💡 SIGNAL: {fib_data['signal']}")
+        print("="*50 + "\n")
+    
+    return fib_data
+
+
+def volume_signal_from_averages(price_change, recent_volume_avg, earlier_volume_avg):
+    """
+    Volume trend and volume-price signal from the recent/earlier volume averages
+    """
+    volume_trend = VOLUME_TRENDS[0] if recent_volume_avg > earlier_volume_avg else VOLUME_TRENDS[1]
+    
+    # Interpret volume patterns
+    if price_change > 0 and recent_volume_avg > earlier_volume_avg:
+        volume_signal = VOLUME_SIGNALS[0]
+    elif price_change > 0 and recent_volume_avg < earlier_volume_avg:
+        volume_signal = VOLUME_SIGNALS[1]
+    elif price_change < 0 and recent_volume_avg > earlier_volume_avg:
+        volume_signal = VOLUME_SIGNALS[2]
+    elif price_change < 0 and recent_volume_avg < earlier_volume_avg:
+        volume_signal = VOLUME_SIGNALS[3]
+    else:
+        volume_signal = VOLUME_SIGNALS[4]
+    
+    return volume_trend, volume_signal
+
+
+@metrics.timed('kraken_analysis_seconds', function='analyze_volume')
+def analyze_volume(btc_24h_list, verbose=True):
+    if not btc_24h_list:
+        if verbose:
+            print("No data to analyze volume!")
+        return None
+    
+    candles = _as_candles(btc_24h_list)
+    volumes = candles.volume
+    prices = candles.close
     
     # Calculate volume statistics
-    total_volume = sum(volumes)
+    total_volume = float(volumes.sum())
     avg_volume = total_volume / len(volumes)
-    max_volume = max(volumes)
-    min_volume = min(volumes)
+    max_volume = float(volumes.max())
+    min_volume = float(volumes.min())
     
     # Find the hour with highest volume
-    max_volume_index = volumes.index(max_volume)
-    max_volume_time = times[max_volume_index]
-    max_volume_price = prices[max_volume_index]
+    max_volume_index = int(volumes.argmax())
+    max_volume_time = candles.time_str(max_volume_index)
+    max_volume_price = float(prices[max_volume_index])
     
     # Calculate price change during high volume periods
     # High volume hours are those above average
-    high_volume_hours = [i for i, v in enumerate(volumes) if v > avg_volume]
+    high_volume_hours = np.flatnonzero(volumes > avg_volume)
     
     # Determine if volume is increasing or decreasing (trend)
-    recent_volume_avg = sum(volumes[-6:]) / 6  # Last 6 hours
-    earlier_volume_avg = sum(volumes[:6]) / 6   # First 6 hours
-    volume_trend = "INCREASING 📈" if recent_volume_avg > earlier_volume_avg else "DECREASING 📉"
+    recent_volume_avg = float(volumes[-6:].sum()) / 6  # Last 6 hours
+    earlier_volume_avg = float(volumes[:6].sum()) / 6   # First 6 hours
     
     # Volume-price divergence analysis
-    price_change = prices[-1] - prices[0]
-    volume_change = volumes[-1] - volumes[0]
+    price_change = float(prices[-1] - prices[0])
+    volume_change = float(volumes[-1] - volumes[0])
     
     # Interpret volume patterns
-    if price_change > 0 and recent_volume_avg > earlier_volume_avg:
-        volume_signal = "BULLISH - Price up with increasing volume"
-    elif price_change > 0 and recent_volume_avg < earlier_volume_avg:
-        volume_signal = "CAUTION - Price up but volume decreasing (weak rally)"
-    elif price_change < 0 and recent_volume_avg > earlier_volume_avg:
-        volume_signal = "BEARISH - Price down with increasing volume"
-    elif price_change < 0 and recent_volume_avg < earlier_volume_avg:
-        volume_signal = "NEUTRAL - Price down but volume decreasing (weak sell-off)"
-    else:
-        volume_signal = "NEUTRAL - Price stable"
+    volume_trend, volume_signal = volume_signal_from_averages(price_change, recent_volume_avg, earlier_volume_avg)
     
     # Print volume analysis
-    print("\n" + "="*50)
-    print("📊 VOLUME ANALYSIS")
-    print("="*50)
-    print(f"Total 24h Volume:     {total_volume:,.2f} BTC")
-    print(f"Average Volume/Hour:  {avg_volume:,.2f} BTC")
-    print(f"Highest Volume:       {max_volume:,.2f} BTC")
-    print(f"  → Time: {max_volume_time}")
-    print(f"  → Price: ${max_volume_price:,.2f}")
-    print(f"Lowest Volume:        {min_volume:,.2f} BTC")
-    print(f"Volume Trend:         {volume_trend}")
-    print(f"Recent Volume Avg:    {recent_volume_avg:,.2f} BTC")
-    print(f"Earlier Volume Avg:   {earlier_volume_avg:,.2f} BTC")
-    print("-" * 50)
-    print(f"💡 VOLUME SIGNAL: {volume_signal}")
-    print("="*50 + "\n")
+    if verbose:
+        print("\n" + "="*50)
+        print("📊 VOLUME ANALYSIS")
+        print("="*50)
+        print(f"Total 24h Volume:     {total_volume:,.2f} BTC")
+        print(f"Average Volume/Hour:  {avg_volume:,.2f} BTC")
+        print(f"Highest Volume:       {max_volume:,.2f} BTC")
+        print(f"  → Time: {max_volume_time}")
+        print(f"  → Price: ${max_volume_price:,.2f}")
+        print(f"Lowest Volume:        {min_volume:,.2f} BTC")
+        print(f"Volume Trend:         {volume_trend}")
+        print(f"Recent Volume Avg:    {recent_volume_avg:,.2f} BTC")
+        print(f"Earlier Volume Avg:   {earlier_volume_avg:,.2f} BTC")
+        print("-" * 50)
+        print(f"💡 VOLUME SIGNAL: {volume_signal}")
+        print("="*50 + "\n")
     
     return {
-        'volumes': volumes,
+        'volumes': volumes.tolist(),
         'total_volume': total_volume,
         'avg_volume': avg_volume,
         'max_volume': max_volume,
@@ -291,68 +1010,195 @@ def analyze_volume(btc_24h_list):
     }
 
 
-def plot_price_and_volume(btc_24h_list, fib_data=None, volume_data=None):
+# Max candles drawn per chart (None = one per horizontal pixel of the figure)
+PLOT_MAX_CANDLES = None
+
+# Max number of x-axis time labels
+PLOT_MAX_TICKS = 12
+
+
+def decimate_candles(candles, max_candles):
+    """
+    Merge adjacent candles into at most max_candles buckets, keeping the true
+    high/low of each bucket: first open, max high, min low, last close,
+    summed volume/count and volume-weighted vwap. Returns (candles, bucket_size).
+    """
+    candles = _as_candles(candles)
+    n = len(candles)
+    if max_candles is None or n <= max_candles:
+        return candles, 1
+    
+    bucket_size = -(-n // max_candles)  # ceil division
+    return _merge_buckets(candles, np.arange(0, n, bucket_size)), bucket_size
+
+
+def _plot_candles(candles, figsize, max_candles):
+    # Rendering cost is bounded by the output width, not the data size
+    if max_candles is None:
+        from matplotlib import rcParams
+        max_candles = int(figsize[0] * rcParams['figure.dpi'])
+    return decimate_candles(candles, max_candles)
+
+
+# Fibonacci level line colors
+FIB_COLORS = {
+    '0.0% (High)': '#ff0000',
+    '0.0% (Low)': '#00ff00',
+    '23.6%': '#ff69b4',
+    '38.2%': '#ffa500',
+    '50.0%': '#9370db',
+    '61.8%': '#ffd700',
+    '78.6%': '#87ceeb',
+    '100.0% (Low)': '#ff0000',
+    '100.0% (High)': '#00ff00'
+}
+
+# Candle colors
+BULLISH_COLOR = '#00c853'  # Green for bullish
+BEARISH_COLOR = '#ff1744'  # Red for bearish
+
+
+def _new_figure(output, nrows=1, figsize=(15, 8), **subplot_kw):
+    """
+    Create a figure - through pyplot when it will be shown on screen, or as a
+    plain Figure (no GUI backend, no global pyplot state) when rendering to bytes.
+    matplotlib is only imported here, the first time a chart is drawn.
+    """
+    if output is None:
+        import matplotlib.pyplot as plt
+        return plt.subplots(nrows, 1, figsize=figsize, **subplot_kw)
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=figsize)
+    return fig, fig.subplots(nrows, 1, **subplot_kw)
+
+
+def _finish_figure(fig, output, chart, render_start):
+    """
+    Show the figure on screen, or return it as PNG/SVG bytes
+    """
+    fig.tight_layout()
+    if output is None:
+        import matplotlib.pyplot as plt
+        plt.show()
+        return None
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=output)
+    metrics.observe('kraken_render_seconds', time.perf_counter() - render_start, chart=chart, format=output)
+    return buffer.getvalue()
+
+
+def _draw_candles(ax, candles):
+    """
+    Draw all candles with two collections (wicks + bodies) instead of one artist per candle
+    """
+    from matplotlib.collections import LineCollection, PolyCollection
+    n = len(candles)
+    x = np.arange(n, dtype=np.float64)
+    bullish = candles.close >= candles.open
+    body_bottom = np.minimum(candles.open, candles.close)
+    body_top = np.maximum(candles.open, candles.close)
+    
+    # Wicks: one (low -> high) segment per candle
+    wicks = np.empty((n, 2, 2))
+    wicks[:, :, 0] = x[:, None]
+    wicks[:, 0, 1] = candles.low
+    wicks[:, 1, 1] = candles.high
+    ax.add_collection(LineCollection(wicks, colors='black', linewidths=1, zorder=1))
+    
+    # Bodies: one (open -> close) rectangle per candle
+    bodies = np.empty((n, 4, 2))
+    bodies[:, [0, 1], 0] = (x - 0.3)[:, None]
+    bodies[:, [2, 3], 0] = (x + 0.3)[:, None]
+    bodies[:, [0, 3], 1] = body_bottom[:, None]
+    bodies[:, [1, 2], 1] = body_top[:, None]
+    colors = np.where(bullish, BULLISH_COLOR, BEARISH_COLOR).tolist()
+    # Outlines would cover the colors once candles are only a few pixels wide
+    edge_width = 1 if n <= 200 else 0
+    ax.add_collection(PolyCollection(bodies, facecolors=colors, edgecolors='black',
+                                     linewidths=edge_width, zorder=2))
+    ax.autoscale_view()
+
+
+def _draw_volume_bars(ax, candles):
+    """
+    Draw volume bars as one collection, green/red by candle direction
+    """
+    from matplotlib.collections import PolyCollection
+    n = len(candles)
+    x = np.arange(n, dtype=np.float64)
+    bars = np.zeros((n, 4, 2))
+    bars[:, [0, 1], 0] = (x - 0.4)[:, None]
+    bars[:, [2, 3], 0] = (x + 0.4)[:, None]
+    bars[:, [1, 2], 1] = candles.volume[:, None]
+    colors = np.where(candles.close >= candles.open, BULLISH_COLOR, BEARISH_COLOR).tolist()
+    ax.add_collection(PolyCollection(bars, facecolors=colors, edgecolors='black',
+                                     linewidths=0.5 if n <= 200 else 0, alpha=0.7))
+    ax.set_ylim(0, max(float(candles.volume.max()), 1e-9) * 1.05)
+
+
+def _draw_fib_levels(ax, fib_data):
+    for level, price in fib_data['levels'].items():
+        color = FIB_COLORS.get(level, '#808080')
+        linestyle = '-' if '61.8%' in level else '--'
+        linewidth = 2 if '61.8%' in level else 1
+        ax.axhline(y=price, color=color, linestyle=linestyle, 
+                   alpha=0.6, linewidth=linewidth, 
+                   label=f'Fib {level}: ${price:,.0f}', zorder=3)
+
+
+def _price_formatter():
+    # Prices with thousands separators: $65,000
+    from matplotlib.ticker import FuncFormatter
+    return FuncFormatter(lambda x, p: f'${x:,.0f}')
+
+
+def _legend_location(candles):
+    # 'best' tests every drawn vertex for overlap - only affordable on small charts
+    return 'best' if len(candles) <= 100 else 'upper left'
+
+
+def _set_time_ticks(ax, candles):
+    # Format x-axis labels (at most PLOT_MAX_TICKS, evenly spaced)
+    step = max(1, -(-len(candles) // PLOT_MAX_TICKS))
+    tick_positions = range(0, len(candles), step)
+    # Show only the time, unless the chart spans more than a day
+    if len(candles) and candles.time[-1] - candles.time[0] > 86400:
+        time_format = '%m-%d %H:%M'
+    else:
+        time_format = '%H:%M'
+    tick_labels = [datetime.fromtimestamp(int(candles.time[i])).strftime(time_format)
+                   for i in tick_positions]
+    ax.set_xticks(tick_positions)
+    ax.set_xticklabels(tick_labels, rotation=45)
+
+
+def plot_price_and_volume(btc_24h_list, fib_data=None, volume_data=None, output=None,
+                          pair_name='Bitcoin (BTC/USD)', max_candles=PLOT_MAX_CANDLES):
+    """
+    Candlestick + volume chart. With output='png' or 'svg' the chart is rendered
+    headless and returned as bytes instead of being shown. Long histories are
+    merged down to max_candles bars before drawing.
+    """
     if not btc_24h_list:
         print("No data to plot!")
-        return
+        return None
     
-    prices = [item['price'] for item in btc_24h_list]
-    volumes = [item['volume'] for item in btc_24h_list]
-    times = [item['time'] for item in btc_24h_list]
+    render_start = time.perf_counter()
+    candles, bucket_size = _plot_candles(btc_24h_list, (15, 10), max_candles)
     
     # Create figure with two subplots (price on top, volume on bottom)
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(15, 10), 
-                                     gridspec_kw={'height_ratios': [3, 1]},
-                                     sharex=True)
+    fig, (ax1, ax2) = _new_figure(output, nrows=2, figsize=(15, 10),
+                                  gridspec_kw={'height_ratios': [3, 1]}, sharex=True)
     
     # ===== TOP PANEL: CANDLESTICK CHART =====
-    for i, candle in enumerate(btc_24h_list):
-        open_price = candle['open']
-        high_price = candle['high']
-        low_price = candle['low']
-        close_price = candle['price']
-        
-        # Determine color (green for bullish, red for bearish)
-        if close_price >= open_price:
-            color = '#00c853'  # Green for bullish
-            body_bottom = open_price
-            body_height = close_price - open_price
-        else:
-            color = '#ff1744'  # Red for bearish
-            body_bottom = close_price
-            body_height = open_price - close_price
-        
-        # Draw the wick (high-low line)
-        ax1.plot([i, i], [low_price, high_price], color='black', linewidth=1, zorder=1)
-        
-        # Draw the body (open-close rectangle)
-        ax1.add_patch(plt.Rectangle((i - 0.3, body_bottom), 0.6, body_height,
-                                     facecolor=color, edgecolor='black', linewidth=1, zorder=2))
+    _draw_candles(ax1, candles)
     
     # Add Fibonacci levels if provided
     if fib_data:
-        fib_colors = {
-            '0.0% (High)': '#ff0000',
-            '0.0% (Low)': '#00ff00',
-            '23.6%': '#ff69b4',
-            '38.2%': '#ffa500',
-            '50.0%': '#9370db',
-            '61.8%': '#ffd700',
-            '78.6%': '#87ceeb',
-            '100.0% (Low)': '#ff0000',
-            '100.0% (High)': '#00ff00'
-        }
-        
-        for level, price in fib_data['levels'].items():
-            color = fib_colors.get(level, '#808080')
-            linestyle = '-' if '61.8%' in level else '--'
-            linewidth = 2 if '61.8%' in level else 1
-            ax1.axhline(y=price, color=color, linestyle=linestyle, 
-                       alpha=0.6, linewidth=linewidth, 
-                       label=f'Fib {level}: ${price:,.0f}', zorder=3)
+        _draw_fib_levels(ax1, fib_data)
     
     # Customize price chart
-    title = 'Bitcoin (BTC/USD) - Candlestick & Volume Analysis (24 Hours)'
+    title = f'{pair_name} - Candlestick & Volume Analysis (24 Hours)'
     if fib_data:
         trend = 'UPTREND' if fib_data['is_uptrend'] else 'DOWNTREND'
         title += f' | {trend}'
@@ -360,120 +1206,103 @@ def plot_price_and_volume(btc_24h_list, fib_data=None, volume_data=None):
     ax1.set_title(title, fontsize=16, fontweight='bold', pad=20)
     ax1.set_ylabel('Price (USD)', fontsize=12, fontweight='bold')
     ax1.grid(True, alpha=0.3, linestyle='--', zorder=0)
-    ax1.legend(loc='best', fontsize=8, ncol=2)
-    ax1.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
-    ax1.set_xlim(-0.5, len(times) - 0.5)
+    if fib_data:
+        ax1.legend(loc=_legend_location(candles), fontsize=8, ncol=2)
+    ax1.yaxis.set_major_formatter(_price_formatter())
+    ax1.set_xlim(-0.5, len(candles) - 0.5)
     
     # ===== BOTTOM PANEL: VOLUME CHART =====
     # Color bars based on price movement (green for up, red for down)
-    colors = []
-    for i, candle in enumerate(btc_24h_list):
-        if candle['price'] >= candle['open']:
-            colors.append('#00c853')  # Green for bullish
-        else:
-            colors.append('#ff1744')  # Red for bearish
-    
-    ax2.bar(range(len(volumes)), volumes, color=colors, alpha=0.7, edgecolor='black', linewidth=0.5)
+    _draw_volume_bars(ax2, candles)
     
-    # Add average volume line
+    # Add average volume line (per bar - bars of merged candles hold bucket_size candles)
     if volume_data:
-        ax2.axhline(y=volume_data['avg_volume'], color='blue', linestyle='--', 
-                   linewidth=2, alpha=0.7, label=f"Avg Volume: {volume_data['avg_volume']:.1f} BTC")
+        avg_volume = volume_data['avg_volume'] * bucket_size
+        ax2.axhline(y=avg_volume, color='blue', linestyle='--', 
+                   linewidth=2, alpha=0.7, label=f"Avg Volume: {avg_volume:.1f} BTC")
+        ax2.legend(loc='upper right', fontsize=9)
     
     # Customize volume chart
     ax2.set_ylabel('Volume (BTC)', fontsize=12, fontweight='bold')
     ax2.set_xlabel('Hour', fontsize=12, fontweight='bold')
     ax2.grid(True, alpha=0.3, linestyle='--', axis='y')
-    ax2.legend(loc='upper right', fontsize=9)
-    ax2.set_xlim(-0.5, len(times) - 0.5)
+    ax2.set_xlim(-0.5, len(candles) - 0.5)
     
-    # Format x-axis labels (show every 4 hours)
-    tick_positions = range(0, len(times), 4)
-    tick_labels = [times[i].split()[1] for i in tick_positions]
-    ax2.set_xticks(tick_positions)
-    ax2.set_xticklabels(tick_labels, rotation=45)
+    _set_time_ticks(ax2, candles)
     
-    plt.tight_layout()
-    plt.show()
+    return _finish_figure(fig, output, 'price_volume', render_start)
+
+
+def calculate_price_stats(btc_24h_list):
+    """
+    Price statistics over the candles: current, high, low, average, change, volatility
+    """
+    if not btc_24h_list:
+        return None
+    
+    prices = _as_candles(btc_24h_list).close
+    price_change = float(prices[-1] - prices[0])
+    return {
+        'current_price': float(prices[-1]),
+        'high': float(prices.max()),
+        'low': float(prices.min()),
+        'average': float(prices.mean()),
+        'change': price_change,
+        'change_pct': float(price_change / prices[0] * 100),
+        'volatility': float(prices.max() - prices.min())
+    }
 
 
-def analyze_and_plot_24h(btc_24h_list, fib_data=None):
+def print_price_stats(stats):
+    """
+    Print the calculate_price_stats() result
+    """
+    print("\n" + "="*50)
+    print("📊 24-HOUR BTC PRICE ANALYSIS")
+    print("="*50)
+    print(f"Current Price:    ${stats['current_price']:,.2f}")
+    print(f"24h High:         ${stats['high']:,.2f}")
+    print(f"24h Low:          ${stats['low']:,.2f}")
+    print(f"24h Average:      ${stats['average']:,.2f}")
+    print(f"24h Change:       ${stats['change']:,.2f} ({stats['change_pct']:+.2f}%)")
+    print(f"Volatility:       ${stats['volatility']:,.2f}")
+    print("="*50 + "\n")
+
+
+def analyze_and_plot_24h(btc_24h_list, fib_data=None, output=None, pair_name='Bitcoin (BTC/USD)',
+                         verbose=True, max_candles=PLOT_MAX_CANDLES):
+    """
+    Price statistics + candlestick chart with Fibonacci levels. With output='png'
+    or 'svg' the chart is rendered headless and returned as bytes. Long histories
+    are merged down to max_candles bars before drawing.
+    """
     if not btc_24h_list:
         print("No data to analyze!")
-        return
+        return None
     
-    # Extract prices and times for analysis
-    prices = [item['price'] for item in btc_24h_list]
-    times = [item['time'] for item in btc_24h_list]
+    render_start = time.perf_counter()
     
     # Calculate statistics
-    current_price = prices[-1]
-    min_price = min(prices)
-    max_price = max(prices)
-    avg_price = sum(prices) / len(prices)
-    price_change = prices[-1] - prices[0]
-    price_change_pct = (price_change / prices[0]) * 100
+    candles = _as_candles(btc_24h_list)
+    stats = calculate_price_stats(candles)
+    min_price = stats['low']
+    max_price = stats['high']
+    avg_price = stats['average']
     
     # Print analysis
-    print("\n" + "="*50)
-    print("📊 24-HOUR BTC PRICE ANALYSIS")
-    print("="*50)
-    print(f"Current Price:    ${current_price:,.2f}")
-    print(f"24h High:         ${max_price:,.2f}")
-    print(f"24h Low:          ${min_price:,.2f}")
-    print(f"24h Average:      ${avg_price:,.2f}")
-    print(f"24h Change:       ${price_change:,.2f} ({price_change_pct:+.2f}%)")
-    print(f"Volatility:       ${max_price - min_price:,.2f}")
-    print("="*50 + "\n")
+    if verbose:
+        print_price_stats(stats)
     
     # Create the plot
-    fig, ax = plt.subplots(figsize=(15, 8))
-    
-    # Plot candlesticks
-    for i, candle in enumerate(btc_24h_list):
-        open_price = candle['open']
-        high_price = candle['high']
-        low_price = candle['low']
-        close_price = candle['price']
-        
-        # Determine color (green for bullish, red for bearish)
-        if close_price >= open_price:
-            color = '#00c853'  # Green for bullish
-            body_bottom = open_price
-            body_height = close_price - open_price
-        else:
-            color = '#ff1744'  # Red for bearish
-            body_bottom = close_price
-            body_height = open_price - close_price
-        
-        # Draw the wick (high-low line)
-        ax.plot([i, i], [low_price, high_price], color='black', linewidth=1, zorder=1)
-        
-        # Draw the body (open-close rectangle)
-        ax.add_patch(plt.Rectangle((i - 0.3, body_bottom), 0.6, body_height,
-                                    facecolor=color, edgecolor='black', linewidth=1, zorder=2))
+    fig, ax = _new_figure(output, figsize=(15, 8))
+    
+    # Plot candlesticks (statistics above use every candle, the chart may merge them)
+    plot_candles, bucket_size = _plot_candles(candles, (15, 8), max_candles)
+    _draw_candles(ax, plot_candles)
     
     # Add Fibonacci levels if provided
     if fib_data:
-        fib_colors = {
-            '0.0% (High)': '#ff0000',
-            '0.0% (Low)': '#00ff00',
-            '23.6%': '#ff69b4',
-            '38.2%': '#ffa500',
-            '50.0%': '#9370db',
-            '61.8%': '#ffd700',
-            '78.6%': '#87ceeb',
-            '100.0% (Low)': '#ff0000',
-            '100.0% (High)': '#00ff00'
-        }
-        
-        for level, price in fib_data['levels'].items():
-            color = fib_colors.get(level, '#808080')
-            linestyle = '-' if '61.8%' in level else '--'
-            linewidth = 2 if '61.8%' in level else 1
-            ax.axhline(y=price, color=color, linestyle=linestyle, 
-                       alpha=0.6, linewidth=linewidth, 
-                       label=f'Fib {level}: ${price:,.0f}', zorder=3)
+        _draw_fib_levels(ax, fib_data)
     else:
         # Add basic horizontal lines if no Fibonacci data
         ax.axhline(y=avg_price, color='green', linestyle='--', 
@@ -484,7 +1313,7 @@ def analyze_and_plot_24h(btc_24h_list, fib_data=None):
                     alpha=0.5, label=f'24h Low: ${min_price:,.0f}')
     
     # Customize the plot
-    title = 'Bitcoin (BTC/USD) - Last 24 Hours (Candlestick Chart)'
+    title = f'{pair_name} - Last 24 Hours (Candlestick Chart)'
     if fib_data:
         trend = 'UPTREND' if fib_data['is_uptrend'] else 'DOWNTREND'
         title += f' | {trend}'
@@ -493,62 +1322,54 @@ def analyze_and_plot_24h(btc_24h_list, fib_data=None):
     ax.set_xlabel('Hour', fontsize=12)
     ax.set_ylabel('Price (USD)', fontsize=12)
     ax.grid(True, alpha=0.3, linestyle='--', zorder=0)
-    ax.legend(loc='best', fontsize=8, ncol=2)
+    ax.legend(loc=_legend_location(plot_candles), fontsize=8, ncol=2)
     
-    # Format x-axis labels (show every 4 hours to avoid crowding)
-    tick_positions = range(0, len(times), 4)
-    tick_labels = [times[i].split()[1] for i in tick_positions]  # Show only time
-    ax.set_xticks(tick_positions)
-    ax.set_xticklabels(tick_labels, rotation=45)
+    _set_time_ticks(ax, plot_candles)
     
     # Format y-axis to show prices with commas
-    ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
+    ax.yaxis.set_major_formatter(_price_formatter())
     
     # Set x-axis limits
-    ax.set_xlim(-0.5, len(times) - 0.5)
+    ax.set_xlim(-0.5, len(plot_candles) - 0.5)
     
-    plt.tight_layout()
-    plt.show()
+    return _finish_figure(fig, output, 'fibonacci', render_start)
 
 
-# Main execution
-if __name__ == "__main__":
-    print("🚀 Starting Kraken Crypto Tracker...")
-    print("-" * 50)
-    
-    # ===== CHOOSE YOUR PARAMETERS HERE =====
-    
-    # Example 1: Default - Bitcoin, 1-hour candles, last 24 hours
-    trading_pair = TRADING_PAIRS['BTC/USD']  # Change to 'ETH/USD', 'XRP/USD', etc.
-    interval = INTERVALS['1hour']             # Change to '5min', '15min', '4hour', etc.
-    num_candles = 24                          # Number of candles to fetch
-    
-    print(f"📈 Analyzing: {[k for k, v in TRADING_PAIRS.items() if v == trading_pair][0]}")
-    print(f"⏱️  Interval: {[k for k, v in INTERVALS.items() if v == interval][0]}")
-    print(f"📊 Candles: {num_candles}")
-    print("-" * 50)
-    
-    # Function 1: Get price data with custom parameters
-    crypto_data = get_24h_btc_prices(trading_pair, interval, num_candles)
+def _render_chart_job(job):
+    # Runs in a worker process - renders one chart to bytes
+    name, chart, candles, fib_data, volume_data, output = job
+    if chart == 'fibonacci':
+        return name, analyze_and_plot_24h(candles, fib_data, output=output, pair_name=name, verbose=False)
+    return name, plot_price_and_volume(candles, fib_data, volume_data, output=output, pair_name=name)
+
+
+def render_charts(charts, chart='price_volume', output='png', output_dir=None, max_workers=None):
+    """
+    Render many charts in parallel worker processes.
+    charts: {name: candles} or {name: (candles, fib_data, volume_data)}
+    chart: 'price_volume' (plot_price_and_volume) or 'fibonacci' (analyze_and_plot_24h)
+    Returns {name: bytes}, and also writes <name>.<output> files if output_dir is given.
+    """
+    jobs = []
+    for name, value in charts.items():
+        candles, fib_data, volume_data = value if isinstance(value, tuple) else (value, None, None)
+        jobs.append((name, chart, _as_candles(candles), fib_data, volume_data, output))
     
-    if crypto_data:
-        # Function 2: Basic statistics (integrated in plotting)
-        
-        # Function 3: Calculate Fibonacci levels and get trading signals
-        fib_data = calculate_fibonacci_levels(crypto_data)
-        
-        # Function 4: Analyze trading volume
-        volume_data = analyze_volume(crypto_data)
-        
-        # Create comprehensive plot with price and volume
-        plot_price_and_volume(crypto_data, fib_data, volume_data)
-        
-        # Also show the basic analysis with Fibonacci
-        analyze_and_plot_24h(crypto_data, fib_data)
-    else:
-        print("❌ Failed to fetch data. Please check your connection.")
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        rendered = dict(executor.map(_render_chart_job, jobs))
     
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        for name, image in rendered.items():
+            if image is None:
+                continue
+            filename = f"{name.replace('/', '_')}.{output}"
+            with open(os.path.join(output_dir, filename), 'wb') as f:
+                f.write(image)
     
+    return rendered
+
+
 # ===== HELPER FUNCTION: Show available options =====
 def show_available_options():
     """
@@ -567,37 +1388,126 @@ def show_available_options():
         print(f"  {name:15s} → {minutes} minutes")
     print("="*50 + "\n")
 
-# Uncomment the line below to see all available options
-# show_available_options()
 
+def parse_pair(value):
+    # Accept 'BTC/USD' or Kraken's own code 'XXBTZUSD'
+    return TRADING_PAIRS.get(value, value)
 
-# ===== ADVANCED: Command Line Usage =====
-"""
-You can also run this script with command-line arguments:
 
-Example 1: Default Bitcoin analysis
-    python kraken_btc_tracker.py
+def parse_interval(value):
+    # Accept '1hour' or minutes '60'
+    if value in INTERVALS:
+        return INTERVALS[value]
+    return int(value)
+
 
-Example 2: Analyze Ethereum with 4-hour candles
-    python kraken_btc_tracker.py --pair ETH/USD --interval 4hour --candles 24
+def _pair_name(trading_pair):
+    return next((name for name, code in TRADING_PAIRS.items() if code == trading_pair), trading_pair)
 
-Example 3: Analyze Solana with 15-minute candles
-    python kraken_btc_tracker.py --pair SOL/USD --interval 15min --candles 48
 
-To enable command-line arguments, uncomment the code below:
+def _interval_name(interval):
+    return next((name for name, minutes in INTERVALS.items() if minutes == interval), f"{interval}min")
+
+
+# ===== Command Line Usage =====
+# Most trades --profile fetches by default (one Trades request per 1000)
+PROFILE_MAX_TRADES = 100_000
+
+CLI_EXAMPLES = """
+examples:
+  python kraken_btc_tracker.py
+  python kraken_btc_tracker.py --pair ETH/USD --interval 4hour --candles 24
+  python kraken_btc_tracker.py --pair SOL/USD --interval 15min --candles 48 --output png
+  python kraken_btc_tracker.py --headless          # analysis only, no charts (cron)
+  python kraken_btc_tracker.py --profile --headless   # + volume profile from individual trades
 """
 
-# import argparse
-# 
-# parser = argparse.ArgumentParser(description='Kraken Crypto Trading Analyzer')
-# parser.add_argument('--pair', type=str, default='BTC/USD', 
-#                     help='Trading pair (e.g., BTC/USD, ETH/USD)')
-# parser.add_argument('--interval', type=str, default='1hour',
-#                     help='Time interval (e.g., 1min, 5min, 1hour, 4hour)')
-# parser.add_argument('--candles', type=int, default=24,
-#                     help='Number of candles to fetch')
-# 
-# args = parser.parse_args()
-# trading_pair = TRADING_PAIRS.get(args.pair, TRADING_PAIRS['BTC/USD'])
-# interval = INTERVALS.get(args.interval, INTERVALS['1hour'])
-# num_candles = args.candles
\ No newline at end of file
+
+def main(argv=None):
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Kraken Crypto Trading Analyzer', epilog=CLI_EXAMPLES,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pair', type=parse_pair, default='BTC/USD',
+                        help='Trading pair (e.g., BTC/USD, ETH/USD or a Kraken code like XXBTZUSD)')
+    parser.add_argument('--interval', type=parse_interval, default='1hour',
+                        help='Time interval (e.g., 1min, 5min, 1hour, 4hour, or minutes)')
+    parser.add_argument('--candles', type=int, default=24,
+                        help='Number of candles to fetch')
+    parser.add_argument('--output', choices=['png', 'svg', 'pdf'],
+                        help='Save the charts as files in this format instead of showing them')
+    parser.add_argument('--output-dir', type=str, default='.',
+                        help='Folder for --output chart files')
+    parser.add_argument('--headless', action='store_true',
+                        help='Never open chart windows (without --output no charts are drawn)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Also build a volume profile from the individual trades behind the candles')
+    parser.add_argument('--profile-trades', type=int, default=PROFILE_MAX_TRADES,
+                        help=f'Most trades --profile fetches (default: {PROFILE_MAX_TRADES:,})')
+    parser.add_argument('--list', action='store_true',
+                        help='Show the available trading pairs and intervals and exit')
+    args = parser.parse_args(argv)
+    
+    if args.list:
+        show_available_options()
+        return 0
+    
+    load_api_keys()
+    pair_name = _pair_name(args.pair)
+    
+    print("🚀 Starting Kraken Crypto Tracker...")
+    print("-" * 50)
+    print(f"📈 Analyzing: {pair_name}")
+    print(f"⏱️  Interval: {_interval_name(args.interval)}")
+    print(f"📊 Candles: {args.candles}")
+    print("-" * 50)
+    
+    # Function 1: Get price data with custom parameters
+    # (retried with backoff; falls back to the last good candles if Kraken struggles)
+    crypto_data = get_24h_btc_prices(args.pair, args.interval, args.candles, stale_while_revalidate=True)
+    if not crypto_data:
+        print("❌ Failed to fetch data. Please check your connection.")
+        return 1
+    if crypto_data.stale:
+        print("⚠️  Kraken is not responding - analyzing the last candles that could be fetched")
+    
+    # Function 2: Calculate Fibonacci levels and get trading signals
+    fib_data = calculate_fibonacci_levels(crypto_data)
+    
+    # Function 3: Analyze trading volume
+    volume_data = analyze_volume(crypto_data)
+    
+    # Where in price that volume traded (one Trades request per 1000 trades)
+    if args.profile:
+        from kraken_trades import volume_profile
+        volume_data['profile'] = volume_profile(args.pair, since=int(crypto_data.time[0]),
+                                               max_trades=args.profile_trades)
+    
+    if args.output:
+        # Render straight to files - no GUI backend needed
+        os.makedirs(args.output_dir, exist_ok=True)
+        prefix = os.path.join(args.output_dir, f"{pair_name.replace('/', '_')}_{_interval_name(args.interval)}")
+        charts = {
+            'price_volume': plot_price_and_volume(crypto_data, fib_data, volume_data,
+                                                  output=args.output, pair_name=pair_name),
+            'fibonacci': analyze_and_plot_24h(crypto_data, fib_data, output=args.output, pair_name=pair_name)
+        }
+        for chart, image in charts.items():
+            path = f"{prefix}_{chart}.{args.output}"
+            with open(path, 'wb') as f:
+                f.write(image)
+            print(f"✓ Saved {path}")
+    elif args.headless:
+        # Analysis only - matplotlib is never imported
+        print_price_stats(calculate_price_stats(crypto_data))
+    else:
+        # Create comprehensive plot with price and volume
+        plot_price_and_volume(crypto_data, fib_data, volume_data, pair_name=pair_name)
+        
+        # Also show the basic analysis with Fibonacci
+        analyze_and_plot_24h(crypto_data, fib_data, pair_name=pair_name)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,425 @@
+import functools
+import math
+from collections import deque
+
+import numpy as np
+
+from kraken_btc_tracker import _as_candles
+
+# ===== TECHNICAL INDICATORS =====
+# EMA, RSI, MACD, Bollinger Bands, ATR, VWAP deviation and trade intensity,
+# built on all candle fields (including Kraken's per-candle vwap and trade count).
+#
+# Every indicator comes twice: a batch function that computes the whole series
+# with NumPy, and a *Stream class that takes one closed candle at a time in O(1).
+# Both run the same floating point operations in the same order, so the stream
+# reproduces the batch values exactly (bit for bit), not just approximately.
+
+# Default periods (candles)
+EMA_PERIOD = 20
+RSI_PERIOD = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+BOLLINGER_PERIOD = 20
+BOLLINGER_STD = 2.0
+ATR_PERIOD = 14
+VWAP_PERIOD = 24
+INTENSITY_PERIOD = 24
+
+# Largest r^-k factor the chunked EMA lets build up before starting a new chunk
+EMA_MAX_GROWTH = 1e100
+EMA_MAX_CHUNK = 256
+
+
+# ----- Shared building blocks -----
+
+@functools.lru_cache(maxsize=None)
+def _ema_tables(alpha):
+    """
+    Lookup tables for the chunked EMA with smoothing factor alpha (r = 1 - alpha).
+    Within a chunk that starts after value p:
+        ema[k] = r^(k+1) * p + alpha * r^k * sum(x[j] * r^-j for j <= k)
+    which is a cumulative sum - so a whole chunk is a few vector operations.
+    Chunks are kept short enough that r^-k stays far from overflowing.
+    """
+    r = 1.0 - alpha
+    size = EMA_MAX_CHUNK
+    if 0 < r < 1:
+        size = max(1, min(EMA_MAX_CHUNK, int(math.log(EMA_MAX_GROWTH) / -math.log(r))))
+    k = np.arange(size, dtype=np.float64)
+    rise = r ** (k + 1)
+    coef = alpha * r ** k
+    decay = r ** -k
+    return size, rise, coef, decay
+
+
+def _alpha(period, alpha):
+    return 2.0 / (period + 1) if alpha is None else alpha
+
+
+def ema(values, period=EMA_PERIOD, alpha=None):
+    """
+    Exponential moving average (alpha = 2 / (period + 1) unless given), starting
+    at the first value. Returns an array as long as values.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    out = np.empty(len(x))
+    if not len(x):
+        return out
+    alpha = _alpha(period, alpha)
+    if alpha >= 1:
+        out[:] = x
+        return out
+
+    size, rise, coef, decay = _ema_tables(alpha)
+    out[0] = prev = x[0]
+    for start in range(1, len(x), size):
+        chunk = x[start:start + size]
+        m = len(chunk)
+        total = np.cumsum(chunk * decay[:m])
+        out[start:start + m] = rise[:m] * prev + coef[:m] * total
+        prev = out[start + m - 1]
+    return out
+
+
+class EMAStream:
+    """
+    Streaming ema(): one value per update, same results as the batch function
+    """
+
+    def __init__(self, period=EMA_PERIOD, alpha=None):
+        self.alpha = _alpha(period, alpha)
+        if self.alpha < 1:
+            size, rise, coef, decay = _ema_tables(self.alpha)
+            self._size = size
+            self._rise, self._coef, self._decay = rise.tolist(), coef.tolist(), decay.tolist()
+        self._k = 0
+        self._prev = None
+        self._total = 0.0
+        self.value = None
+
+    def update(self, value):
+        value = float(value)
+        if self.value is None or self.alpha >= 1:
+            self.value = value
+            return value
+        k = self._k
+        if k == 0:
+            # New chunk - it continues from the last value of the previous one
+            self._prev = self.value
+            self._total = 0.0
+        self._total += value * self._decay[k]
+        self.value = self._rise[k] * self._prev + self._coef[k] * self._total
+        self._k = (k + 1) % self._size
+        return self.value
+
+
+def _window_sums(values, period):
+    # Sum of the last `period` values at every position (NaN until the window is full),
+    # as the difference of two running totals
+    x = np.asarray(values, dtype=np.float64)
+    out = np.full(len(x), np.nan)
+    if len(x) >= period:
+        running = np.concatenate([[0.0], np.cumsum(x)])
+        out[period - 1:] = running[period:] - running[:len(x) - period + 1]
+    return out
+
+
+class _WindowSum:
+    """
+    Streaming _window_sums(): running total minus the total `period` values ago
+    """
+
+    def __init__(self, period):
+        self.period = period
+        self._running = 0.0
+        self._history = deque([0.0], maxlen=period + 1)
+
+    def update(self, value):
+        self._running += float(value)
+        self._history.append(self._running)
+        if len(self._history) <= self.period:
+            return math.nan
+        return self._running - self._history[0]
+
+
+def _divide(numerator, denominator):
+    # Plain float division, NaN instead of ZeroDivisionError (like NumPy)
+    return numerator / denominator if denominator else math.nan
+
+
+# ----- RSI -----
+
+def rsi(close, period=RSI_PERIOD):
+    """
+    Relative Strength Index with Wilder smoothing (alpha = 1 / period).
+    NaN for the first candle, which has no price change yet.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    out = np.full(len(close), np.nan)
+    if len(close) < 2:
+        return out
+    change = np.diff(close)
+    avg_gain = ema(np.maximum(change, 0.0), alpha=1.0 / period)
+    avg_loss = ema(np.maximum(-change, 0.0), alpha=1.0 / period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    # No losses at all: 100, or 50 when the price did not move either
+    value = np.where(avg_loss == 0, np.where(avg_gain > 0, 100.0, 50.0), value)
+    out[1:] = value
+    return out
+
+
+class RSIStream:
+    def __init__(self, period=RSI_PERIOD):
+        self._gain = EMAStream(alpha=1.0 / period)
+        self._loss = EMAStream(alpha=1.0 / period)
+        self._last_close = None
+        self.value = math.nan
+
+    def update(self, close):
+        close = float(close)
+        if self._last_close is not None:
+            change = close - self._last_close
+            avg_gain = self._gain.update(max(change, 0.0))
+            avg_loss = self._loss.update(max(-change, 0.0))
+            if avg_loss == 0:
+                self.value = 100.0 if avg_gain > 0 else 50.0
+            else:
+                self.value = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        self._last_close = close
+        return self.value
+
+
+# ----- MACD -----
+
+def macd(close, fast=MACD_FAST, slow=MACD_SLOW, signal=MACD_SIGNAL):
+    """
+    MACD line (fast EMA - slow EMA), signal line (EMA of MACD) and histogram
+    """
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+class MACDStream:
+    def __init__(self, fast=MACD_FAST, slow=MACD_SLOW, signal=MACD_SIGNAL):
+        self._fast = EMAStream(fast)
+        self._slow = EMAStream(slow)
+        self._signal = EMAStream(signal)
+
+    def update(self, close):
+        line = self._fast.update(close) - self._slow.update(close)
+        signal_line = self._signal.update(line)
+        return line, signal_line, line - signal_line
+
+
+# ----- Bollinger Bands -----
+
+def bollinger(close, period=BOLLINGER_PERIOD, num_std=BOLLINGER_STD):
+    """
+    Bollinger Bands: (middle, upper, lower) = SMA +/- num_std standard deviations.
+    Prices are measured from the first close so the running sums stay small.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if not len(close):
+        return close.copy(), close.copy(), close.copy()
+    shifted = close - close[0]
+    mean = _window_sums(shifted, period) / period
+    variance = np.maximum(_window_sums(shifted * shifted, period) / period - mean * mean, 0.0)
+    std = np.sqrt(variance)
+    middle = mean + close[0]
+    return middle, middle + num_std * std, middle - num_std * std
+
+
+class BollingerStream:
+    def __init__(self, period=BOLLINGER_PERIOD, num_std=BOLLINGER_STD):
+        self.period = period
+        self.num_std = num_std
+        self._origin = None
+        self._sum = _WindowSum(period)
+        self._squares = _WindowSum(period)
+
+    def update(self, close):
+        close = float(close)
+        if self._origin is None:
+            self._origin = close
+        shifted = close - self._origin
+        mean = self._sum.update(shifted) / self.period
+        variance = max(self._squares.update(shifted * shifted) / self.period - mean * mean, 0.0)
+        if math.isnan(mean):
+            return math.nan, math.nan, math.nan
+        std = math.sqrt(variance)
+        middle = mean + self._origin
+        return middle, middle + self.num_std * std, middle - self.num_std * std
+
+
+# ----- ATR -----
+
+def atr(high, low, close, period=ATR_PERIOD):
+    """
+    Average True Range with Wilder smoothing. The first candle's true range is high - low.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    true_range = high - low
+    if len(close) > 1:
+        previous = close[:-1]
+        true_range[1:] = np.maximum(np.maximum(true_range[1:], np.abs(high[1:] - previous)),
+                                    np.abs(low[1:] - previous))
+    return ema(true_range, alpha=1.0 / period)
+
+
+class ATRStream:
+    def __init__(self, period=ATR_PERIOD):
+        self._average = EMAStream(alpha=1.0 / period)
+        self._last_close = None
+
+    def update(self, high, low, close):
+        high, low = float(high), float(low)
+        true_range = high - low
+        if self._last_close is not None:
+            true_range = max(max(true_range, abs(high - self._last_close)), abs(low - self._last_close))
+        self._last_close = float(close)
+        return self._average.update(true_range)
+
+
+# ----- VWAP deviation -----
+
+def vwap_deviation(close, vwap, volume, period=VWAP_PERIOD):
+    """
+    How far the close is from the volume-weighted average price of the last
+    `period` candles (built from Kraken's per-candle vwap): close / VWAP - 1
+    """
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    traded = _window_sums(np.asarray(vwap, dtype=np.float64) * volume, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return close / (traded / _window_sums(volume, period)) - 1.0
+
+
+class VWAPDeviationStream:
+    def __init__(self, period=VWAP_PERIOD):
+        self._traded = _WindowSum(period)
+        self._volume = _WindowSum(period)
+
+    def update(self, close, vwap, volume):
+        volume = float(volume)
+        window_vwap = _divide(self._traded.update(float(vwap) * volume), self._volume.update(volume))
+        return _divide(float(close), window_vwap) - 1.0
+
+
+# ----- Trade intensity -----
+
+def trade_intensity(count, period=INTENSITY_PERIOD):
+    """
+    Trades in each candle relative to the average of the last `period` candles
+    (Kraken's per-candle trade count). Above 1 = busier than usual.
+    """
+    count = np.asarray(count, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return count / (_window_sums(count, period) / period)
+
+
+class TradeIntensityStream:
+    def __init__(self, period=INTENSITY_PERIOD):
+        self.period = period
+        self._count = _WindowSum(period)
+
+    def update(self, count):
+        count = float(count)
+        return _divide(count, self._count.update(count) / self.period)
+
+
+# ----- All indicators together -----
+
+# Keys of compute_indicators() / indicator_summary() / IndicatorStream.update()
+INDICATOR_KEYS = ('ema', 'rsi', 'macd', 'macd_signal', 'macd_histogram',
+                  'bollinger_middle', 'bollinger_upper', 'bollinger_lower',
+                  'atr', 'vwap_deviation', 'trade_intensity')
+
+
+def compute_indicators(candles):
+    """
+    Every indicator over the whole series: {key: array} (keys in INDICATOR_KEYS)
+    """
+    candles = _as_candles(candles)
+    macd_line, macd_signal, macd_histogram = macd(candles.close)
+    middle, upper, lower = bollinger(candles.close)
+    return {
+        'ema': ema(candles.close),
+        'rsi': rsi(candles.close),
+        'macd': macd_line,
+        'macd_signal': macd_signal,
+        'macd_histogram': macd_histogram,
+        'bollinger_middle': middle,
+        'bollinger_upper': upper,
+        'bollinger_lower': lower,
+        'atr': atr(candles.high, candles.low, candles.close),
+        'vwap_deviation': vwap_deviation(candles.close, candles.vwap, candles.volume),
+        'trade_intensity': trade_intensity(candles.count)
+    }
+
+
+def _plain(value):
+    # JSON-friendly float (NaN while an indicator is still warming up -> None)
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+def indicator_summary(candles):
+    """
+    Latest value of every indicator as a plain dict - the same kind of result
+    dict calculate_fibonacci_levels / analyze_volume return
+    """
+    candles = _as_candles(candles)
+    if not len(candles):
+        return None
+    return {key: _plain(values[-1]) for key, values in compute_indicators(candles).items()}
+
+
+class IndicatorStream:
+    """
+    All indicators updated one closed candle at a time, in O(1) per candle.
+    update() returns the same dict as indicator_summary() for the candles seen so far.
+    """
+
+    def __init__(self):
+        self._ema = EMAStream()
+        self._rsi = RSIStream()
+        self._macd = MACDStream()
+        self._bollinger = BollingerStream()
+        self._atr = ATRStream()
+        self._vwap = VWAPDeviationStream()
+        self._intensity = TradeIntensityStream()
+        self.result = None
+
+    @classmethod
+    def from_candles(cls, candles):
+        stream = cls()
+        candles = _as_candles(candles)
+        for i in range(len(candles)):
+            stream.update(candles.high[i], candles.low[i], candles.close[i],
+                          candles.vwap[i], candles.volume[i], candles.count[i])
+        return stream
+
+    def update(self, high, low, close, vwap, volume, count):
+        macd_line, macd_signal, macd_histogram = self._macd.update(close)
+        middle, upper, lower = self._bollinger.update(close)
+        values = {
+            'ema': self._ema.update(close),
+            'rsi': self._rsi.update(close),
+            'macd': macd_line,
+            'macd_signal': macd_signal,
+            'macd_histogram': macd_histogram,
+            'bollinger_middle': middle,
+            'bollinger_upper': upper,
+            'bollinger_lower': lower,
+            'atr': self._atr.update(high, low, close),
+            'vwap_deviation': self._vwap.update(close, vwap, volume),
+            'trade_intensity': self._intensity.update(count)
+        }
+        self.result = {key: _plain(value) for key, value in values.items()}
+        return self.result
@@ -0,0 +1,263 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+# ===== METRICS =====
+# Counters and timers for the hot paths (HTTP round trip, JSON parse, candle
+# construction, analysis, rendering, caches). Disabled by default: every
+# call then returns immediately, so instrumentation costs next to nothing.
+#
+# Enable with KRAKEN_METRICS=1 in the environment, or kraken_metrics.enable().
+# Export with prometheus_text() or log_metrics().
+
+_enabled = os.getenv('KRAKEN_METRICS', '') not in ('', '0', 'false', 'False')
+
+_lock = threading.Lock()
+_counters = {}  # (name, labels) -> value
+_timers = {}    # (name, labels) -> [count, total seconds, max seconds]
+_help = {}      # name -> help text
+
+logger = logging.getLogger('kraken.metrics')
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _timers.clear()
+
+
+def describe(name, help_text):
+    """
+    Set the HELP line for a metric in the Prometheus export
+    """
+    _help[name] = help_text
+
+
+def inc(name, value=1, **labels):
+    """
+    Add value to a counter
+    """
+    if not _enabled:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, seconds, **labels):
+    """
+    Record one duration for a timer
+    """
+    if not _enabled:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        stats = _timers.get(key)
+        if stats is None:
+            _timers[key] = [1, seconds, seconds]
+        else:
+            stats[0] += 1
+            stats[1] += seconds
+            if seconds > stats[2]:
+                stats[2] = seconds
+
+
+class _Timer:
+    __slots__ = ('name', 'labels', 'start')
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name, **labels):
+    """
+    Context manager that times the block:  with timer('kraken_parse_seconds'): ...
+    """
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(name, labels)
+
+
+def timed(name, **labels):
+    """
+    Decorator that times every call of a function
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start, **labels)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    """
+    Current values as a plain dict (counters, timers, cache hit ratios)
+    """
+    with _lock:
+        counters = dict(_counters)
+        timers = {key: list(stats) for key, stats in _timers.items()}
+
+    result = {'counters': {}, 'timers': {}, 'cache_hit_ratio': {}}
+    for (name, labels), value in counters.items():
+        result['counters'][_format_key(name, labels)] = value
+    for (name, labels), (count, total, longest) in timers.items():
+        result['timers'][_format_key(name, labels)] = {
+            'count': count,
+            'total_seconds': total,
+            'mean_seconds': total / count,
+            'max_seconds': longest
+        }
+
+    # Hit ratio for every cache that reports <cache>_hits_total / <cache>_misses_total
+    for (name, labels), hits in counters.items():
+        if name.endswith('_hits_total'):
+            cache = name[:-len('_hits_total')]
+            misses = counters.get((f"{cache}_misses_total", labels), 0)
+            if hits + misses:
+                result['cache_hit_ratio'][_format_key(cache, labels)] = hits / (hits + misses)
+    return result
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _format_key(name, labels):
+    return name + _format_labels(labels)
+
+
+def prometheus_text():
+    """
+    All metrics in the Prometheus text exposition format
+    """
+    with _lock:
+        counters = sorted(_counters.items())
+        timers = sorted((key, list(stats)) for key, stats in _timers.items())
+
+    lines = []
+    seen = set()
+    for (name, labels), value in counters:
+        if name not in seen:
+            seen.add(name)
+            if name in _help:
+                lines.append(f"# HELP {name} {_help[name]}")
+            lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    for (name, labels), (count, total, longest) in timers:
+        if name not in seen:
+            seen.add(name)
+            if name in _help:
+                lines.append(f"# HELP {name} {_help[name]}")
+            lines.append(f"# TYPE {name} summary")
+        lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+    # Longest observed duration, as a separate gauge per timer
+    for (name, labels), (count, total, longest) in timers:
+        if f"{name}_max" not in seen:
+            seen.add(f"{name}_max")
+            lines.append(f"# TYPE {name}_max gauge")
+        lines.append(f"{name}_max{_format_labels(labels)} {longest}")
+
+    return '\n'.join(lines) + '\n'
+
+
+def log_metrics():
+    """
+    Emit the current metrics as one structured (JSON) log record
+    """
+    logger.info(json.dumps({'event': 'metrics', **snapshot()}))
+
+
+def start_log_exporter(interval=60):
+    """
+    Log the metrics every `interval` seconds from a background thread
+    """
+    def run():
+        while True:
+            time.sleep(interval)
+            log_metrics()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+describe('kraken_http_requests_total', 'Kraken HTTP requests sent')
+describe('kraken_http_request_seconds', 'Kraken HTTP round trip time')
+describe('kraken_http_response_bytes_total', 'Bytes received from Kraken')
+describe('kraken_http_throttled_total', 'Responses where Kraken asked us to slow down')
+describe('kraken_requests_coalesced_total', 'Requests answered by an identical in-flight request')
+describe('kraken_json_parse_seconds', 'Time spent decoding Kraken JSON responses')
+describe('kraken_candle_build_seconds', 'Time spent converting raw OHLC rows into candles')
+describe('kraken_candles_processed_total', 'Candles converted from Kraken responses')
+describe('kraken_analysis_seconds', 'Time spent in analysis functions')
+describe('kraken_render_seconds', 'Time spent rendering charts')
+describe('kraken_candle_cache_hits_total', 'OHLC fetches that only asked for candles newer than the cached cursor')
+describe('kraken_candle_cache_misses_total', 'OHLC fetches that downloaded the full candle window')
+describe('kraken_analysis_cache_hits_total', 'Service-mode requests answered from the analysis cache')
+describe('kraken_analysis_cache_misses_total', 'Service-mode requests that had to compute the analysis')
+describe('kraken_analysis_errors_total', 'Service-mode requests that failed with an unexpected error')
+describe('kraken_book_checksum_failures_total', 'Order book updates that failed the Kraken checksum')
+describe('kraken_trades_processed_total', 'Individual trades decoded from the Trades endpoint')
+describe('kraken_scan_analyzed_total', 'Scanner pairs re-analyzed after their last closed candle changed')
+describe('kraken_scan_unchanged_total', 'Scanner fetches whose last closed candle had not changed')
+describe('kraken_private_nonce_retries_total', 'Private requests resent because Kraken saw their nonce out of order')
+describe('kraken_shm_read_retries_total', 'Shared-memory analyses redone because the fetcher wrote meanwhile')
+describe('kraken_shm_read_timeouts_total', 'Shared-memory reads given up on because a write never finished')
+describe('kraken_http_failures_total', 'Kraken requests that failed: connection error, timeout, 5xx or a broken response')
+describe('kraken_circuit_opened_total', 'Times an endpoint circuit breaker opened')
+describe('kraken_circuit_rejected_total', 'Requests refused because the endpoint circuit was open')
+describe('kraken_stale_responses_total', 'Stale-while-revalidate fetches answered with the last good candles')
@@ -0,0 +1,335 @@
+import json
+import zlib
+from bisect import bisect_left, bisect_right, insort
+
+import numpy as np
+
+import kraken_metrics as metrics
+from kraken_btc_tracker import TRADING_PAIRS, _pair_result, public_request
+from kraken_stream import WS_URL, KrakenStream, ws_pair_name
+
+# ===== ORDER BOOK (L2) =====
+# Price-level order books from Kraken's Depth endpoint, kept up to date from
+# the WebSocket "book" channel. Each side keeps its prices in a sorted list
+# (binary search for upserts/deletes) plus a dict of levels, and can verify
+# itself against Kraken's CRC32 checksum after every update.
+
+# Levels per side to fetch from the Depth endpoint (max 500)
+DEPTH_COUNT = 100
+
+# Levels per side for the WebSocket book (10, 25, 100, 500 or 1000)
+BOOK_DEPTH = 100
+
+# Levels per side that go into Kraken's book checksum
+CHECKSUM_LEVELS = 10
+
+# Liquidity "near" a Fibonacci level: within this fraction of its price
+LEVEL_BAND = 0.0025
+
+
+def _checksum_part(value):
+    # Kraken checksum format: decimal point removed, leading zeros stripped
+    return value.replace('.', '').lstrip('0')
+
+
+class BookSide:
+    """
+    One side of the book: price -> (volume, price string, volume string).
+    Prices are kept sorted best-first; the original strings are kept for the checksum.
+    """
+
+    def __init__(self, descending):
+        self.descending = descending
+        self._keys = []    # sorted ascending; bids store -price so the best level comes first
+        self._levels = {}  # price -> (volume, price_str, volume_str)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def clear(self):
+        self._keys.clear()
+        self._levels.clear()
+
+    def update(self, price_str, volume_str):
+        """
+        Insert, replace or (volume 0) delete one price level
+        """
+        price = float(price_str)
+        volume = float(volume_str)
+        key = -price if self.descending else price
+        if volume == 0:
+            if self._levels.pop(price, None) is not None:
+                del self._keys[bisect_left(self._keys, key)]
+            return
+        if price not in self._levels:
+            insort(self._keys, key)
+        self._levels[price] = (volume, price_str, volume_str)
+
+    def truncate(self, depth):
+        # Drop levels beyond the subscribed depth (Kraken does not send deletes for them)
+        while len(self._keys) > depth:
+            key = self._keys.pop()
+            del self._levels[-key if self.descending else key]
+
+    def best(self):
+        if not self._keys:
+            return None
+        key = self._keys[0]
+        return -key if self.descending else key
+
+    def levels(self, n=None):
+        """
+        [(price, volume)] best-first
+        """
+        keys = self._keys if n is None else self._keys[:n]
+        sign = -1 if self.descending else 1
+        return [(sign * key, self._levels[sign * key][0]) for key in keys]
+
+    def arrays(self):
+        """
+        (prices, volumes) as NumPy arrays, best-first
+        """
+        levels = self.levels()
+        return (np.array([price for price, volume in levels], dtype=np.float64),
+                np.array([volume for price, volume in levels], dtype=np.float64))
+
+    def volume_between(self, low, high):
+        """
+        Total volume resting at prices in [low, high]
+        """
+        if self.descending:
+            start, end = bisect_left(self._keys, -high), bisect_right(self._keys, -low)
+        else:
+            start, end = bisect_left(self._keys, low), bisect_right(self._keys, high)
+        sign = -1 if self.descending else 1
+        return sum(self._levels[sign * key][0] for key in self._keys[start:end])
+
+    def checksum_text(self, n=CHECKSUM_LEVELS):
+        sign = -1 if self.descending else 1
+        parts = []
+        for key in self._keys[:n]:
+            volume, price_str, volume_str = self._levels[sign * key]
+            parts.append(_checksum_part(price_str) + _checksum_part(volume_str))
+        return ''.join(parts)
+
+
+class OrderBook:
+    """
+    L2 order book for one pair. depth=None keeps every level it is given.
+    """
+
+    def __init__(self, trading_pair, depth=None):
+        self.trading_pair = trading_pair
+        self.depth = depth
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+
+    def __repr__(self):
+        return f"OrderBook({self.trading_pair}, {len(self.bids)} bids, {len(self.asks)} asks)"
+
+    def apply_snapshot(self, asks, bids):
+        """
+        Replace the whole book. Entries are Kraken rows: [price, volume, timestamp]
+        """
+        self.asks.clear()
+        self.bids.clear()
+        self.apply_update(asks, bids)
+
+    def apply_update(self, asks=(), bids=()):
+        """
+        Apply changed levels (volume '0' deletes a level)
+        """
+        for entry in asks:
+            self.asks.update(entry[0], entry[1])
+        for entry in bids:
+            self.bids.update(entry[0], entry[1])
+        if self.depth is not None:
+            self.asks.truncate(self.depth)
+            self.bids.truncate(self.depth)
+
+    def best_bid(self):
+        return self.bids.best()
+
+    def best_ask(self):
+        return self.asks.best()
+
+    def mid_price(self):
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return (bid + ask) / 2
+
+    def spread(self):
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return ask - bid
+
+    def checksum(self):
+        """
+        Kraken's book checksum: CRC32 over the top 10 asks, then the top 10 bids
+        """
+        return zlib.crc32((self.asks.checksum_text() + self.bids.checksum_text()).encode())
+
+    def liquidity_near_levels(self, levels, band=LEVEL_BAND):
+        """
+        Resting liquidity around each Fibonacci level (the 'levels' dict from
+        calculate_fibonacci_levels). For each level: bid and ask volume within
+        +/- band of the price, and the cumulative volume between the current
+        mid price and the level - what the price has to eat through to get there.
+        """
+        mid = self.mid_price()
+        bid_prices, bid_volumes = self.bids.arrays()
+        ask_prices, ask_volumes = self.asks.arrays()
+        bid_cumulative = np.cumsum(bid_volumes)
+        ask_cumulative = np.cumsum(ask_volumes)
+
+        result = {}
+        for level, price in levels.items():
+            low, high = price * (1 - band), price * (1 + band)
+            if mid is not None and price < mid:
+                # Support: bids from the best bid down to the level
+                side, reached = 'bid', np.searchsorted(-bid_prices, -price, side='right')
+                cumulative = float(bid_cumulative[reached - 1]) if reached else 0.0
+            else:
+                # Resistance: asks from the best ask up to the level
+                side, reached = 'ask', np.searchsorted(ask_prices, price, side='right')
+                cumulative = float(ask_cumulative[reached - 1]) if reached else 0.0
+            result[level] = {
+                'price': price,
+                'side': side,
+                'bid_volume': self.bids.volume_between(low, high),
+                'ask_volume': self.asks.volume_between(low, high),
+                'cumulative_volume': cumulative
+            }
+        return result
+
+
+def fetch_order_book(trading_pair='XXBTZUSD', count=DEPTH_COUNT):
+    """
+    Order book snapshot from the Depth endpoint, or None on failure
+    """
+    try:
+        data = public_request('Depth', {'pair': trading_pair, 'count': count})
+    except Exception as e:
+        print(f"Error fetching order book: {e}")
+        return None
+
+    if data['error']:
+        print(f"API Error: {data['error']}")
+        return None
+
+    result = _pair_result(data['result'], trading_pair)
+    book = OrderBook(trading_pair)
+    book.apply_snapshot(result['asks'], result['bids'])
+    print(f"✓ Successfully fetched order book of {trading_pair} "
+          f"({len(book.bids)} bids, {len(book.asks)} asks)")
+    return book
+
+
+def print_liquidity(liquidity):
+    print("\n" + "="*70)
+    print("📚 LIQUIDITY NEAR FIBONACCI LEVELS")
+    print("="*70)
+    for level, info in liquidity.items():
+        print(f"{level:15s} ${info['price']:>12,.2f}  bids {info['bid_volume']:>10,.4f}  "
+              f"asks {info['ask_volume']:>10,.4f}  to reach ({info['side']}) {info['cumulative_volume']:>10,.4f}")
+    print("="*70 + "\n")
+
+
+class BookStream(KrakenStream):
+    """
+    Live L2 books for one or more pairs (names as in TRADING_PAIRS) from the
+    WebSocket "book" channel. With validate=True every update is checked against
+    Kraken's checksum; a book that drifts is dropped and re-subscribed.
+    """
+
+    def __init__(self, pairs=('BTC/USD',), depth=BOOK_DEPTH, on_update=None, url=WS_URL, validate=True):
+        super().__init__(url)
+
+        self.pairs = list(pairs)
+        self.depth = depth
+        self.on_update = on_update
+        self.validate = validate
+
+        # WebSocket pair name -> our pair name
+        self._names = {ws_pair_name(name): name for name in self.pairs}
+        self.books = {name: OrderBook(TRADING_PAIRS.get(name, name), depth) for name in self.pairs}
+        # Pairs whose book is waiting for a fresh snapshot
+        self._stale = set(self.pairs)
+        self.checksum_failures = 0
+
+    def subscribe_message(self, pairs=None, event='subscribe'):
+        return json.dumps({
+            'event': event,
+            'pair': list(pairs or self._names),
+            'subscription': {'name': 'book', 'depth': self.depth}
+        })
+
+    def description(self):
+        return f"order books for {', '.join(self.pairs)} (depth {self.depth})"
+
+    def on_connect(self):
+        # A new connection starts every book from a fresh snapshot
+        self._stale = set(self.pairs)
+
+    def handle_message(self, message):
+        """
+        Process one raw WebSocket message. Returns the pair name if its book changed.
+        """
+        data = json.loads(message)
+
+        # Events (heartbeat, systemStatus, subscriptionStatus) are dicts
+        if isinstance(data, dict):
+            if data.get('event') == 'subscriptionStatus' and data.get('status') == 'error':
+                print(f"Subscription error: {data.get('errorMessage')}")
+            return None
+
+        # Book message: [channelID, {...}, ({...},) "book-N", pair]
+        if len(data) < 4 or not str(data[-2]).startswith('book'):
+            return None
+        name = self._names.get(data[-1])
+        if name is None:
+            return None
+        book = self.books[name]
+        payloads = data[1:-2]
+
+        if 'as' in payloads[0] or 'bs' in payloads[0]:
+            book.apply_snapshot(payloads[0].get('as', []), payloads[0].get('bs', []))
+            self._stale.discard(name)
+        elif name in self._stale:
+            # Updates for a book we are re-subscribing - wait for the snapshot
+            return None
+        else:
+            checksum = None
+            for payload in payloads:
+                book.apply_update(payload.get('a', []), payload.get('b', []))
+                checksum = payload.get('c', checksum)
+            if self.validate and checksum is not None and book.checksum() != int(checksum):
+                self._resync(name)
+                return None
+
+        if self.on_update:
+            self.on_update(name, book)
+        return name
+
+    def _resync(self, name):
+        # Our copy no longer matches Kraken's - get a fresh snapshot
+        self.checksum_failures += 1
+        metrics.inc('kraken_book_checksum_failures_total', pair=name)
+        print(f"⚠️  {name} order book checksum mismatch - resubscribing")
+        self._stale.add(name)
+        if self._ws is not None:
+            ws_name = ws_pair_name(name)
+            self._ws.send(self.subscribe_message([ws_name], 'unsubscribe'))
+            self._ws.send(self.subscribe_message([ws_name]))
+
+
+if __name__ == "__main__":
+    from kraken_btc_tracker import get_24h_btc_prices, calculate_fibonacci_levels
+
+    candles = get_24h_btc_prices(TRADING_PAIRS['BTC/USD'], 60, 24)
+    book = fetch_order_book(TRADING_PAIRS['BTC/USD'])
+    if candles and book:
+        fib_data = calculate_fibonacci_levels(candles, verbose=False)
+        print_liquidity(book.liquidity_near_levels(fib_data['levels']))
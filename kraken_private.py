@@ -0,0 +1,237 @@
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlparse
+
+import kraken_btc_tracker as tracker
+import kraken_metrics as metrics
+from kraken_btc_tracker import REQUEST_TIMEOUT, RequestScheduler, THROTTLE_ERRORS, get_session, json_loads
+
+# ===== PRIVATE API CLIENT =====
+# Signed requests to Kraken's private endpoints with the API_KEY/API_SECRET
+# from .env, plus an incremental local copy of the account's trade and ledger
+# history. History pages are fetched in parallel under Kraken's private rate
+# limit; later syncs only download entries newer than the local copy.
+
+PRIVATE_URL = "https://api.kraken.com/0/private"
+
+# Kraken private rate limit per verification tier: (counter decay per second, max counter)
+PRIVATE_RATE_LIMITS = {
+    'starter': (0.33, 15),
+    'intermediate': (0.5, 20),
+    'pro': (1.0, 20)
+}
+
+# TradesHistory and Ledgers add 2 to the rate counter, other calls 1
+HISTORY_COST = 2
+
+# Entries per TradesHistory/Ledgers page (fixed by Kraken)
+HISTORY_PAGE_SIZE = 50
+
+# Parallel history page requests (the rate limiter still paces them)
+HISTORY_MAX_WORKERS = 4
+
+# Retries with a fresh nonce when parallel requests arrive out of order
+NONCE_MAX_RETRIES = 3
+
+# Default folder for the local history copies
+PRIVATE_CACHE_DIR = 'private_cache'
+
+# Endpoint and result key for each history kind
+HISTORY_ENDPOINTS = {
+    'trades': ('TradesHistory', 'trades'),
+    'ledgers': ('Ledgers', 'ledger')
+}
+
+
+def sign_request(url_path, data, secret):
+    """
+    Kraken API-Sign: HMAC-SHA512 of (URI path + SHA256(nonce + POST data)),
+    keyed with the base64-decoded API secret, base64-encoded
+    """
+    post_data = urlencode(data)
+    message = url_path.encode() + hashlib.sha256((str(data['nonce']) + post_data).encode()).digest()
+    signature = hmac.new(base64.b64decode(secret), message, hashlib.sha512)
+    return base64.b64encode(signature.digest()).decode()
+
+
+class NonceGenerator:
+    """
+    Strictly increasing nonces (microseconds since the epoch), safe to share
+    between threads. Parallel requests can still reach Kraken out of order -
+    either give the API key a nonce window or let the client retry.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last = 0
+
+    def __call__(self):
+        with self._lock:
+            self._last = max(self._last + 1, time.time_ns() // 1000)
+            return self._last
+
+
+class PrivateClient:
+    """
+    Signed client for Kraken's private endpoints. Keys default to the ones
+    load_api_keys() reads from .env.
+    """
+
+    def __init__(self, api_key=None, api_secret=None, tier='starter', url=PRIVATE_URL):
+        if api_key is None and api_secret is None:
+            if not (tracker.API_KEY and tracker.API_SECRET):
+                tracker.load_api_keys(verbose=False)
+            api_key, api_secret = tracker.API_KEY, tracker.API_SECRET
+        if not (api_key and api_secret):
+            raise ValueError("Private endpoints need KRAKEN_API_KEY and KRAKEN_API_SECRET in .env")
+
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.url = url.rstrip('/')
+        # Path part of the URL - it is what gets signed
+        self._path = urlparse(self.url).path
+        rate, burst = PRIVATE_RATE_LIMITS[tier]
+        self.limiter = RequestScheduler(rate=rate, burst=burst)
+        self.nonce = NonceGenerator()
+
+    @property
+    def account_id(self):
+        # Short fingerprint of the API key - keeps local copies of different accounts apart
+        return hashlib.sha256(self.api_key.encode()).hexdigest()[:12]
+
+    def request(self, method, params=None, cost=1):
+        """
+        POST a signed request to a private endpoint and return the parsed JSON.
+        Retries when Kraken throttles us or sees a nonce out of order.
+        """
+        url_path = f"{self._path}/{method}"
+        for attempt in range(max(self.limiter.max_retries, NONCE_MAX_RETRIES) + 1):
+            self.limiter.acquire(cost)
+            data = dict(params or {}, nonce=self.nonce())
+            headers = {
+                'API-Key': self.api_key,
+                'API-Sign': sign_request(url_path, data, self.api_secret)
+            }
+            with metrics.timer('kraken_http_request_seconds', endpoint=method):
+                response = get_session().post(f"{self.url}/{method}", data=data, headers=headers,
+                                              timeout=REQUEST_TIMEOUT)
+            metrics.inc('kraken_http_requests_total', endpoint=method, status=response.status_code)
+            response.raise_for_status()
+
+            result = json_loads(response.content)
+            errors = result.get('error') or []
+            if any(error.startswith(THROTTLE_ERRORS) for error in errors) and attempt < self.limiter.max_retries:
+                self.limiter.throttled()
+                continue
+            if 'EAPI:Invalid nonce' in errors and attempt < NONCE_MAX_RETRIES:
+                metrics.inc('kraken_private_nonce_retries_total')
+                continue
+            return result
+
+
+class HistoryCache:
+    """
+    Local copy of one history kind ('trades' or 'ledgers') for one account:
+    an append-only JSON-lines file, one entry per line with its id
+    """
+
+    def __init__(self, kind, account_id, root=PRIVATE_CACHE_DIR):
+        self.kind = kind
+        self.path = os.path.join(root, f"{account_id}_{kind}.jsonl")
+        self.entries = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    entry = json_loads(line)
+                    self.entries[entry['id']] = entry
+
+    def __len__(self):
+        return len(self.entries)
+
+    def latest_time(self):
+        return max((entry['time'] for entry in self.entries.values()), default=None)
+
+    def add(self, entries):
+        """
+        Append the entries not stored yet (oldest first). Returns how many were new.
+        """
+        new = sorted((entry for entry in entries if entry['id'] not in self.entries),
+                     key=lambda entry: entry['time'])
+        if not new:
+            return 0
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a') as f:
+            for entry in new:
+                f.write(json.dumps(entry) + '\n')
+                self.entries[entry['id']] = entry
+        return len(new)
+
+
+def _history_page(client, kind, params):
+    # One page as [{'id': ..., **entry}], newest first, plus the total count
+    method, key = HISTORY_ENDPOINTS[kind]
+    data = client.request(method, params, cost=HISTORY_COST)
+    if data['error']:
+        raise RuntimeError(f"{method} failed: {data['error']}")
+    entries = [dict(entry, id=entry_id) for entry_id, entry in data['result'][key].items()]
+    return entries, int(data['result']['count'])
+
+
+def sync_history(client, kind='ledgers', root=PRIVATE_CACHE_DIR, max_workers=HISTORY_MAX_WORKERS):
+    """
+    Bring the local copy of the account's trade or ledger history up to date.
+    Only entries newer than the newest local one are requested; their pages are
+    fetched in parallel, oldest first, and stored as soon as they arrive, so an
+    interrupted sync picks up where it stopped. Returns the HistoryCache.
+    """
+    cache = HistoryCache(kind, client.account_id, root)
+    params = {}
+    latest = cache.latest_time()
+    if latest is not None:
+        # 'start' is exclusive - step back a second so entries sharing the newest
+        # timestamp are not lost (duplicates are dropped by id)
+        params['start'] = int(latest) - 1
+
+    entries, count = _history_page(client, kind, dict(params, ofs=0))
+    added = 0
+    if count > len(entries) and entries:
+        # Pin the end to the newest entry seen, so entries arriving mid-sync
+        # don't shift the offsets of the remaining pages
+        params['end'] = max(entry['time'] for entry in entries)
+        # Highest offset = oldest page. Every page stored extends the local copy
+        # without a gap, so the next sync's 'start' never skips anything.
+        offsets = list(range(HISTORY_PAGE_SIZE, count, HISTORY_PAGE_SIZE))[::-1]
+        workers = max(1, min(max_workers, len(offsets)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # One batch at a time - a failed page stops the sync before more are requested
+            for i in range(0, len(offsets), workers):
+                batch = offsets[i:i + workers]
+                for page, _ in executor.map(lambda ofs: _history_page(client, kind, dict(params, ofs=ofs)), batch):
+                    added += cache.add(page)
+
+    added += cache.add(entries)
+    print(f"✓ Synced {kind}: {added} new, {len(cache)} stored")
+    return cache
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Kraken Private History Sync')
+    parser.add_argument('--kind', choices=list(HISTORY_ENDPOINTS), nargs='+', default=list(HISTORY_ENDPOINTS),
+                        help='History to sync')
+    parser.add_argument('--tier', choices=list(PRIVATE_RATE_LIMITS), default='starter',
+                        help='Account verification tier (sets the rate limit)')
+    parser.add_argument('--workers', type=int, default=HISTORY_MAX_WORKERS,
+                        help='Parallel page requests')
+    args = parser.parse_args()
+
+    tracker.load_api_keys()
+    client = PrivateClient(tier=args.tier)
+    for kind in args.kind:
+        sync_history(client, kind, max_workers=args.workers)
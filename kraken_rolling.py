@@ -0,0 +1,161 @@
+from collections import deque
+
+import numpy as np
+
+from kraken_btc_tracker import _as_candles, fibonacci_from_swing, volume_signal_from_averages
+
+# ===== ROLLING (INCREMENTAL) ANALYSIS =====
+# Sliding-window counterparts of calculate_fibonacci_levels and analyze_volume.
+# Each update() adds one closed candle and drops the oldest one in O(1)
+# (amortized), instead of recomputing the whole window.
+
+# Number of candles in the recent/earlier volume averages (same as analyze_volume)
+VOLUME_TREND_CANDLES = 6
+
+
+class _MonotonicWindow:
+    """
+    Sliding-window max (or min) using a monotonic deque of (index, value)
+    """
+
+    def __init__(self, use_max=True):
+        self.use_max = use_max
+        self._items = deque()
+
+    def push(self, index, value):
+        # Strict comparison keeps the earliest index on ties (like list.index)
+        items = self._items
+        if self.use_max:
+            while items and items[-1][1] < value:
+                items.pop()
+        else:
+            while items and items[-1][1] > value:
+                items.pop()
+        items.append((index, value))
+
+    def expire(self, oldest_index):
+        # Drop entries that slid out of the window
+        items = self._items
+        while items and items[0][0] < oldest_index:
+            items.popleft()
+
+    @property
+    def value(self):
+        return self._items[0][1]
+
+
+class RollingFibonacci:
+    """
+    Incremental calculate_fibonacci_levels over the last `window` closes
+    """
+
+    def __init__(self, window=24):
+        self.window = window
+        self._closes = deque()
+        self._high = _MonotonicWindow(use_max=True)
+        self._low = _MonotonicWindow(use_max=False)
+        self._count = 0
+
+    @classmethod
+    def from_candles(cls, candles, window=24):
+        rolling = cls(window)
+        for close in _as_candles(candles).close.tolist():
+            rolling.update(close)
+        return rolling
+
+    def __len__(self):
+        return len(self._closes)
+
+    def update(self, close):
+        index = self._count
+        self._count += 1
+
+        self._closes.append(close)
+        if len(self._closes) > self.window:
+            self._closes.popleft()
+
+        oldest_index = self._count - len(self._closes)
+        self._high.push(index, close)
+        self._low.push(index, close)
+        self._high.expire(oldest_index)
+        self._low.expire(oldest_index)
+
+    def result(self):
+        """
+        Same dict as calculate_fibonacci_levels for the current window
+        """
+        if not self._closes:
+            return None
+        return fibonacci_from_swing(self._closes[-1], self._high.value, self._low.value)
+
+
+class RollingVolume:
+    """
+    Incremental analyze_volume over the last `window` candles.
+
+    The window total is summed with NumPy in result() rather than kept as a
+    running sum, so it matches analyze_volume to the last bit (O(window),
+    cheap at the usual 24 candles).
+    """
+
+    def __init__(self, window=24):
+        self.window = window
+        self._closes = deque()
+        self._volumes = deque()
+        self._max = _MonotonicWindow(use_max=True)
+        self._count = 0
+
+    @classmethod
+    def from_candles(cls, candles, window=24):
+        rolling = cls(window)
+        candles = _as_candles(candles)
+        for close, volume in zip(candles.close.tolist(), candles.volume.tolist()):
+            rolling.update(close, volume)
+        return rolling
+
+    def __len__(self):
+        return len(self._volumes)
+
+    def update(self, close, volume):
+        index = self._count
+        self._count += 1
+
+        self._closes.append(close)
+        self._volumes.append(volume)
+        if len(self._volumes) > self.window:
+            self._closes.popleft()
+            self._volumes.popleft()
+
+        self._max.push(index, volume)
+        self._max.expire(self._count - len(self._volumes))
+
+    def result(self, include_volumes=True):
+        """
+        Same dict as analyze_volume for the current window.
+        include_volumes=False skips copying the window into the 'volumes' list.
+        """
+        if not self._volumes:
+            return None
+
+        volumes = self._volumes
+        n = len(volumes)
+        k = min(VOLUME_TREND_CANDLES, n)
+
+        # Only the first/last 6 candles are needed - deque indexing at the ends is O(1)
+        recent_volume_avg = sum(volumes[i] for i in range(n - k, n)) / VOLUME_TREND_CANDLES
+        earlier_volume_avg = sum(volumes[i] for i in range(k)) / VOLUME_TREND_CANDLES
+        price_change = self._closes[-1] - self._closes[0]
+        # Same pairwise summation as analyze_volume's volumes.sum()
+        total_volume = float(np.fromiter(volumes, dtype=np.float64, count=n).sum())
+
+        volume_trend, volume_signal = volume_signal_from_averages(
+            price_change, recent_volume_avg, earlier_volume_avg)
+
+        return {
+            'volumes': list(volumes) if include_volumes else None,
+            'total_volume': total_volume,
+            'avg_volume': total_volume / n,
+            'max_volume': self._max.value,
+            'volume_signal': volume_signal,
+            'volume_trend': volume_trend
+        }
@@ -0,0 +1,253 @@
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import kraken_metrics as metrics
+from kraken_btc_tracker import (
+    public_request, get_24h_btc_prices, calculate_fibonacci_levels, analyze_volume,
+    parse_interval, VOLUME_SIGNALS, FIB_SIGNALS, FIB_SIGNAL_DIRECTIONS, VOLUME_SIGNAL_DIRECTIONS
+)
+
+# ===== MARKET-WIDE SCANNER =====
+# Signals for every pair Kraken lists in the chosen quote currencies, not just
+# TRADING_PAIRS. Pairs come from the AssetPairs endpoint. One batched Ticker
+# request per sweep shows which pairs traded at all; only those that also
+# closed a new candle are re-fetched (incrementally, through the candle
+# cache), and only pairs whose last closed candle really changed are
+# re-analyzed. Every sweep ends within a time budget - whatever is still due
+# is fetched first next sweep - and returns a ranked signal table.
+
+# Quote currencies to scan
+SCAN_QUOTES = ('USD', 'EUR')
+
+# Concurrent OHLC fetches (the shared scheduler still paces them)
+SCAN_MAX_WORKERS = 8
+
+# Pairs per Ticker request
+TICKER_BATCH_SIZE = 100
+
+# Seconds a sweep may spend fetching - leaves headroom inside a 1-minute candle
+SCAN_TIME_BUDGET = 50.0
+
+# One row per pair, strongest signals first
+SCAN_DTYPE = np.dtype([
+    ('pair', 'U16'),
+    ('name', 'U16'),
+    ('interval', 'i8'),
+    ('time', 'i8'),
+    ('current_price', 'f8'),
+    ('is_uptrend', '?'),
+    ('zone', 'U32'),
+    ('signal', 'U48'),
+    ('volume_signal', 'U64'),
+    ('score', 'i1'),
+    ('quote_volume', 'f8')
+])
+
+
+def discover_pairs(quotes=SCAN_QUOTES):
+    """
+    {Kraken pair code: 'BASE/QUOTE'} for every online pair quoted in `quotes`
+    """
+    try:
+        data = public_request('AssetPairs')
+    except Exception as e:
+        print(f"Error fetching asset pairs: {e}")
+        return {}
+
+    if data['error']:
+        print(f"API Error: {data['error']}")
+        return {}
+
+    pairs = {}
+    for code, info in data['result'].items():
+        name = info.get('wsname')
+        if not name or info.get('status', 'online') != 'online':
+            continue
+        if name.split('/')[-1] in quotes:
+            pairs[code] = name
+    print(f"✓ Found {len(pairs)} pairs quoted in {', '.join(quotes)}")
+    return pairs
+
+
+def fetch_activity(pairs):
+    """
+    {pair: (trades today, last price, 24h volume in the quote currency)} from
+    batched Ticker requests - a pair whose trade count did not move has not traded
+    """
+    pairs = list(pairs)
+    activity = {}
+    for start in range(0, len(pairs), TICKER_BATCH_SIZE):
+        try:
+            data = public_request('Ticker', {'pair': ','.join(pairs[start:start + TICKER_BATCH_SIZE])})
+        except Exception as e:
+            print(f"Error fetching tickers: {e}")
+            continue
+        if data['error']:
+            print(f"API Error: {data['error']}")
+            continue
+        for pair, ticker in data['result'].items():
+            last_price = float(ticker['c'][0])
+            activity[pair] = (int(ticker['t'][0]), last_price, float(ticker['v'][1]) * last_price)
+    return activity
+
+
+def signal_score(signal, volume_signal):
+    """
+    Rank key: Fibonacci direction counts double, volume confirms or weakens it
+    """
+    return (2 * FIB_SIGNAL_DIRECTIONS[FIB_SIGNALS.index(signal)]
+            + VOLUME_SIGNAL_DIRECTIONS[VOLUME_SIGNALS.index(volume_signal)])
+
+
+class MarketScanner:
+    """
+    Keeps the latest signals for every scanned pair. Call sweep() once per
+    candle period (or run() to do that in a loop).
+    """
+
+    def __init__(self, interval=60, num_candles=24, quotes=SCAN_QUOTES,
+                 max_workers=SCAN_MAX_WORKERS, time_budget=SCAN_TIME_BUDGET):
+        self.interval = interval
+        self.num_candles = num_candles
+        self.quotes = quotes
+        self.max_workers = max_workers
+        self.time_budget = time_budget
+
+        self.pairs = None     # pair -> name, from AssetPairs
+        self.results = {}     # pair -> result row (tuple in SCAN_DTYPE order)
+        self._fetched = {}    # pair -> (candle period, Ticker trade count) at the last fetch
+        self._closed = {}     # pair -> (time, close, volume) of the last closed candle analyzed
+        self._activity = {}
+        self._backlog = set()  # pairs that were due but cut off by the time budget
+        self._stopped = threading.Event()
+
+    def _due(self, pair, period):
+        # A closed candle can only change if a new one closed and the pair traded since
+        fetched = self._fetched.get(pair)
+        if fetched is None:
+            return True
+        trades = self._activity.get(pair, (None,))[0]
+        # Without a Ticker trade count there is no telling - fetch once per new candle
+        if trades is None or fetched[1] is None:
+            return period > fetched[0]
+        return period > fetched[0] and trades != fetched[1]
+
+    def _refresh(self, pair, period, deadline):
+        # Runs in a worker thread: fetch one pair and re-analyze it if its last closed candle changed
+        if time.monotonic() > deadline:
+            return False
+        # One extra candle - the last one Kraken sends is still forming
+        candles = get_24h_btc_prices(pair, self.interval, self.num_candles + 1)
+        if not candles:
+            return False
+        self._fetched[pair] = (period, self._activity.get(pair, (None,))[0])
+
+        closed = candles[:-1]
+        if not len(closed):
+            return False
+        key = (int(closed.time[-1]), float(closed.close[-1]), float(closed.volume[-1]))
+        if self._closed.get(pair) == key:
+            metrics.inc('kraken_scan_unchanged_total')
+            return False
+
+        fib_data = calculate_fibonacci_levels(closed, verbose=False)
+        volume_data = analyze_volume(closed, verbose=False)
+        self._closed[pair] = key
+        self.results[pair] = (
+            pair, self.pairs[pair], self.interval, key[0], fib_data['current_price'],
+            fib_data['is_uptrend'], fib_data['zone'], fib_data['signal'], volume_data['volume_signal'],
+            signal_score(fib_data['signal'], volume_data['volume_signal']), 0.0
+        )
+        metrics.inc('kraken_scan_analyzed_total')
+        return True
+
+    def sweep(self):
+        """
+        One pass over the market. Returns the ranked signal table.
+        """
+        start = time.monotonic()
+        if self.pairs is None:
+            self.pairs = discover_pairs(self.quotes)
+        self._activity = fetch_activity(self.pairs)
+
+        # Candle periods since the epoch - a new one means the previous candle closed
+        period = int(time.time()) // (self.interval * 60)
+        # Left over from the last sweep first, then busiest first - a sweep cut
+        # short by the budget skips the quiet pairs
+        due = sorted((pair for pair in self.pairs if self._due(pair, period)),
+                     key=lambda pair: (pair not in self._backlog, -self._activity.get(pair, (0, 0.0, 0.0))[2]))
+
+        deadline = start + self.time_budget
+        analyzed = 0
+        if due:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(due)))) as executor:
+                analyzed = sum(executor.map(lambda pair: self._refresh(pair, period, deadline), due))
+        self._backlog = {pair for pair in due if self._fetched.get(pair, (None,))[0] != period}
+
+        table = self.table()
+        print(f"✓ Sweep: {len(self.pairs)} pairs, {len(due)} due, {analyzed} re-analyzed "
+              f"in {time.monotonic() - start:.1f}s")
+        return table
+
+    def table(self):
+        """
+        Latest signals as a SCAN_DTYPE table, strongest first (ties: most traded first)
+        """
+        table = np.array(list(self.results.values()), dtype=SCAN_DTYPE)
+        table['quote_volume'] = [self._activity.get(pair, (0, 0.0, 0.0))[2] for pair in table['pair']]
+        order = np.lexsort((-table['quote_volume'], -np.abs(table['score'])))
+        return table[order]
+
+    def run(self, on_sweep=None):
+        """
+        Sweep once per candle period, just after each candle closes, until stop()
+        """
+        self._stopped.clear()
+        seconds = self.interval * 60
+        while not self._stopped.is_set():
+            table = self.sweep()
+            if on_sweep:
+                on_sweep(table)
+            # A couple of seconds past the boundary, so Kraken has closed the candle
+            self._stopped.wait(seconds - time.time() % seconds + 2)
+
+    def stop(self):
+        self._stopped.set()
+
+
+def print_scan(table, top=25):
+    print("\n" + "="*110)
+    print("🔭 MARKET SCAN")
+    print("="*110)
+    print(f"  {'Pair':12s} {'Price':>14s} {'Score':>6s}  {'Signal':42s} {'Volume signal':30s}")
+    print("-" * 110)
+    for row in table[:top]:
+        trend = '📈' if row['is_uptrend'] else '📉'
+        print(f"  {row['name']:12s} {row['current_price']:>14,.6g} {row['score']:+6d}  "
+              f"{trend} {row['signal']:40s} {row['volume_signal'][:30]:30s}")
+    print("="*110 + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Kraken Market Scanner')
+    parser.add_argument('--interval', type=parse_interval, default='1hour',
+                        help='Candle interval (e.g., 1min, 15min, 1hour)')
+    parser.add_argument('--candles', type=int, default=24,
+                        help='Closed candles per analysis')
+    parser.add_argument('--quotes', nargs='+', default=list(SCAN_QUOTES),
+                        help='Quote currencies to scan')
+    parser.add_argument('--top', type=int, default=25,
+                        help='Rows to print')
+    parser.add_argument('--loop', action='store_true',
+                        help='Keep sweeping once per candle period')
+    args = parser.parse_args()
+
+    scanner = MarketScanner(args.interval, args.candles, tuple(args.quotes))
+    if args.loop:
+        scanner.run(lambda table: print_scan(table, args.top))
+    else:
+        print_scan(scanner.sweep(), args.top)
@@ -0,0 +1,263 @@
+import argparse
+import json
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+import kraken_metrics as metrics
+from kraken_indicators import indicator_summary
+from kraken_btc_tracker import (
+    get_24h_btc_prices, calculate_fibonacci_levels, analyze_volume, calculate_price_stats,
+    parse_pair, parse_interval
+)
+
+# ===== SERVICE MODE =====
+# Long-running HTTP server exposing the analysis as JSON. Results are cached
+# per (pair, interval, candles) until the current candle closes, so many
+# clients share a handful of upstream Kraken calls.
+
+# Default listen address
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8080
+
+# Cache settings: max entries (least recently used are evicted first),
+# max seconds an entry lives even if its candle has not closed yet,
+# and a small grace period so Kraken has published the closed candle
+CACHE_MAX_ENTRIES = 256
+CACHE_MAX_TTL = 60
+CACHE_CLOSE_GRACE = 2
+
+# Seconds a result built from stale candles is cached (Kraken was failing -
+# try again soon, but don't hammer it)
+CACHE_STALE_TTL = 5
+
+# Largest candle count a client may ask for (Kraken returns up to 720)
+MAX_CANDLES = 720
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-entry expiry. Concurrent misses for the same
+    key are computed once and shared.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._in_flight = {}           # key -> Future
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute, expires_at):
+        """
+        Return the cached value for key, or compute() it and cache it until
+        expires_at(value). Values for which compute() returns None are not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                metrics.inc('kraken_analysis_cache_hits_total')
+                return entry[1]
+
+            self.misses += 1
+            metrics.inc('kraken_analysis_cache_misses_total')
+            future = self._in_flight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            value = compute()
+            if value is not None:
+                with self._lock:
+                    self._entries[key] = (expires_at(value), value)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0
+            }
+
+
+def candle_close_expiry(interval):
+    """
+    Expiry time for a result: when the current candle closes (capped at CACHE_MAX_TTL)
+    """
+    now = time.time()
+    step = interval * 60
+    next_close = (now // step + 1) * step + CACHE_CLOSE_GRACE
+    return min(next_close, now + CACHE_MAX_TTL)
+
+
+class AnalysisService:
+    """
+    Computes and caches analysis results for (pair, interval, candles)
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache or TTLCache()
+
+    def analysis(self, trading_pair, interval, num_candles):
+        key = (trading_pair, interval, num_candles)
+        return self.cache.get_or_compute(
+            key,
+            lambda: self._compute(trading_pair, interval, num_candles),
+            lambda result: time.time() + CACHE_STALE_TTL if result['stale'] else candle_close_expiry(interval))
+
+    def _compute(self, trading_pair, interval, num_candles):
+        # Slow or failing Kraken calls fall back to the last good candles
+        candles = get_24h_btc_prices(trading_pair, interval, num_candles, stale_while_revalidate=True)
+        if not candles:
+            return None
+        return {
+            'pair': trading_pair,
+            'interval': interval,
+            'candles': len(candles),
+            'last_candle_time': int(candles.time[-1]),
+            'stale': candles.stale,
+            'fetched_at': candles.fetched_at,
+            'fibonacci': calculate_fibonacci_levels(candles, verbose=False),
+            'volume': analyze_volume(candles, verbose=False),
+            'stats': calculate_price_stats(candles),
+            'indicators': indicator_summary(candles)
+        }
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET /analysis, /fibonacci, /volume, /stats, /indicators  ?pair=BTC/USD&interval=1hour&candles=24
+    GET /health, /metrics (Prometheus text format)
+    """
+
+    # Which part of the analysis each endpoint returns (None = everything)
+    ENDPOINTS = {
+        '/analysis': None,
+        '/fibonacci': 'fibonacci',
+        '/volume': 'volume',
+        '/stats': 'stats',
+        '/indicators': 'indicators'
+    }
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if url.path == '/health':
+            return self._send(200, {'status': 'ok', 'cache': self.server.service.cache.stats()})
+        if url.path == '/metrics':
+            return self._send_text(200, metrics.prometheus_text())
+        if url.path not in self.ENDPOINTS:
+            return self._send(404, {'error': f'Unknown endpoint {url.path}'})
+
+        try:
+            trading_pair = parse_pair(query.get('pair', 'BTC/USD'))
+            interval = parse_interval(query.get('interval', '1hour'))
+            num_candles = int(query.get('candles', 24))
+        except ValueError as e:
+            return self._send(400, {'error': f'Bad parameter: {e}'})
+        if not 1 <= num_candles <= MAX_CANDLES:
+            return self._send(400, {'error': f'candles must be between 1 and {MAX_CANDLES}'})
+
+        try:
+            result = self.server.service.analysis(trading_pair, interval, num_candles)
+        except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+            # Kraken failed or sent an answer we could not read
+            print(f"Analysis error: {e}")
+            result = None
+        except Exception:
+            # A bug - keep the traceback, but still answer the client
+            metrics.inc('kraken_analysis_errors_total', endpoint=url.path)
+            traceback.print_exc()
+            result = None
+        if result is None:
+            return self._send(502, {'error': 'Failed to fetch data from Kraken'})
+
+        part = self.ENDPOINTS[url.path]
+        self._send(200, result if part is None else {
+            'pair': result['pair'],
+            'interval': result['interval'],
+            'candles': result['candles'],
+            part: result[part]
+        })
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_text(self, status, text):
+        data = text.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Keep the console for fetch messages - no per-request access log
+        pass
+
+
+class AnalysisServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Default listen backlog (5) drops connections under bursts of clients
+    request_queue_size = 128
+
+
+def create_server(host=SERVER_HOST, port=SERVER_PORT, service=None):
+    server = AnalysisServer((host, port), AnalysisRequestHandler)
+    server.service = service or AnalysisService()
+    return server
+
+
+def serve(host=SERVER_HOST, port=SERVER_PORT):
+    server = create_server(host, port)
+    print(f"🚀 Serving analysis on http://{host}:{server.server_address[1]}")
+    print("   Endpoints: /analysis /fibonacci /volume /stats /indicators /health /metrics")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Kraken Crypto Analysis Server')
+    parser.add_argument('--host', type=str, default=SERVER_HOST,
+                        help='Address to listen on')
+    parser.add_argument('--port', type=int, default=SERVER_PORT,
+                        help='Port to listen on')
+    args = parser.parse_args()
+    serve(args.host, args.port)
@@ -0,0 +1,337 @@
+import argparse
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+import kraken_metrics as metrics
+from kraken_btc_tracker import (
+    CANDLE_CACHE_SIZE, Candles, _as_candles, get_24h_btc_prices,
+    calculate_fibonacci_levels, analyze_volume, plot_price_and_volume,
+    parse_pair, parse_interval
+)
+
+# ===== SHARED-MEMORY CANDLE RINGS =====
+# One fetcher process keeps a ring of recent candles per (pair, interval) in
+# shared memory; any number of analysis/render processes attach to it by name
+# and read the candles in place - one set of API calls and one copy of the
+# data, however many workers there are.
+#
+# Each ring is a small int64 header followed by one column per candle field.
+# Columns are mirrored (every candle is written at slot i and i + capacity),
+# so the newest N candles are always one contiguous slice: Candles built on
+# them are views into shared memory, not copies. Consistency is a seqlock:
+# the writer makes the sequence counter odd while it writes and even when it
+# is done; readers check the counter did not move while they used the data.
+
+# Candles kept per ring
+RING_CAPACITY = CANDLE_CACHE_SIZE
+
+# Header slots (int64): sequence counter, candles written in total, capacity, layout version
+_SEQ, _WRITTEN, _CAPACITY, _VERSION = range(4)
+_HEADER_SLOTS = 8
+RING_VERSION = 1
+
+# Column dtypes, in Candles.FIELDS order
+RING_DTYPES = [np.int64, np.float64, np.float64, np.float64, np.float64, np.float64, np.float64, np.int64]
+
+# Times a reader retries a read the writer overlapped before taking a locked-out copy
+READ_MAX_RETRIES = 100
+
+# Seconds a reader waits for an unfinished write before giving up on the ring
+# (the fetcher was killed in the middle of publish())
+READ_TIMEOUT = 1.0
+
+# Seconds between fetches in the fetcher process
+FETCH_PERIOD = 15.0
+
+
+def ring_name(trading_pair, interval):
+    return f"kraken_{trading_pair}_{interval}"
+
+
+def _attach(name):
+    # Readers must not register the segment with a resource tracker - it would
+    # be unlinked (or unregistered for the fetcher) when a reader exits
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class CandleRing:
+    """
+    Shared-memory candle ring for one (pair, interval). The fetcher creates it
+    with CandleRing.create() and calls publish(); workers use CandleRing.attach()
+    and read().
+    """
+
+    def __init__(self, shm, owner=False):
+        self._shm = shm
+        self.owner = owner
+        self.header = np.ndarray(_HEADER_SLOTS, dtype=np.int64, buffer=shm.buf)
+        self.capacity = int(self.header[_CAPACITY])
+        if self.header[_VERSION] != RING_VERSION:
+            raise ValueError(f"Shared memory {shm.name} is not a version {RING_VERSION} candle ring")
+
+        # One mirrored column (2 x capacity) per candle field
+        self.columns = []
+        offset = _HEADER_SLOTS * 8
+        for dtype in RING_DTYPES:
+            self.columns.append(np.ndarray(2 * self.capacity, dtype=dtype, buffer=shm.buf, offset=offset))
+            offset += 2 * self.capacity * 8
+
+    @classmethod
+    def create(cls, trading_pair, interval, capacity=RING_CAPACITY):
+        size = _HEADER_SLOTS * 8 + len(RING_DTYPES) * 2 * capacity * 8
+        name = ring_name(trading_pair, interval)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left over from a fetcher that did not shut down cleanly
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray(_HEADER_SLOTS, dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[_CAPACITY] = capacity
+        header[_VERSION] = RING_VERSION
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, trading_pair, interval):
+        return cls(_attach(ring_name(trading_pair, interval)))
+
+    def __len__(self):
+        return int(min(self.header[_WRITTEN], self.capacity))
+
+    def __repr__(self):
+        return f"CandleRing({self._shm.name}, {len(self)}/{self.capacity} candles)"
+
+    # ----- Writer -----
+
+    def _write(self, index, values):
+        slot = index % self.capacity
+        for column, value in zip(self.columns, values):
+            column[slot] = value
+            column[slot + self.capacity] = value
+
+    def publish(self, candles):
+        """
+        Add new candles (and the update of the still-forming last one).
+        Only the fetcher process calls this.
+        """
+        candles = _as_candles(candles)
+        written = int(self.header[_WRITTEN])
+        last_time = int(self.columns[0][(written - 1) % self.capacity]) if written else None
+        fields = [getattr(candles, field) for field in Candles.FIELDS]
+
+        # Candles at or after the newest stored one: the first may replace it
+        start = 0 if last_time is None else int(np.searchsorted(candles.time, last_time))
+        if start >= len(candles):
+            return 0
+
+        self.header[_SEQ] += 1  # odd: write in progress
+        index = written
+        if last_time is not None and candles.time[start] == last_time:
+            index -= 1
+        for i in range(start, len(candles)):
+            self._write(index, [field[i] for field in fields])
+            index += 1
+        self.header[_WRITTEN] = index
+        self.header[_SEQ] += 1  # even: consistent again
+        return index - written
+
+    # ----- Readers -----
+
+    @property
+    def sequence(self):
+        return int(self.header[_SEQ])
+
+    def changed(self, sequence):
+        """
+        True if the writer touched the ring since `sequence` was read
+        """
+        return int(self.header[_SEQ]) != sequence
+
+    def _view(self, n):
+        written = int(self.header[_WRITTEN])
+        n = len(self) if n is None else min(n, len(self))
+        start = (written - n) % self.capacity
+        return Candles(*(column[start:start + n] for column in self.columns))
+
+    def read(self, n=None):
+        """
+        The newest n candles (all if None) as zero-copy views into shared memory,
+        plus the sequence number they belong to. The views follow later writes -
+        use changed(sequence) to check they were not overwritten while in use.
+        Raises TimeoutError if a write stays unfinished for READ_TIMEOUT seconds.
+        """
+        deadline = time.monotonic() + READ_TIMEOUT
+        while True:
+            sequence = int(self.header[_SEQ])
+            if sequence % 2 == 0:
+                candles = self._view(n)
+                if not self.changed(sequence):
+                    return candles, sequence
+            elif time.monotonic() > deadline:
+                metrics.inc('kraken_shm_read_timeouts_total')
+                raise TimeoutError(f"{self._shm.name}: the fetcher stopped in the middle of a write")
+            time.sleep(0)
+
+    def snapshot(self, n=None):
+        """
+        A private copy of the newest n candles
+        """
+        while True:
+            candles, sequence = self.read(n)
+            copy = Candles(*(getattr(candles, field).copy() for field in Candles.FIELDS))
+            if not self.changed(sequence):
+                return copy
+
+    def consistent(self, function, n=None):
+        """
+        Run function(candles) on zero-copy candles and retry if the fetcher wrote
+        meanwhile (falls back to a private copy after READ_MAX_RETRIES tries)
+        """
+        for _ in range(READ_MAX_RETRIES):
+            candles, sequence = self.read(n)
+            result = function(candles)
+            if not self.changed(sequence):
+                return result
+            metrics.inc('kraken_shm_read_retries_total')
+        return function(self.snapshot(n))
+
+    def close(self):
+        self.header = None
+        self.columns = []
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+
+# ----- Fetcher process -----
+
+class RingFetcher:
+    """
+    The single process that talks to Kraken: keeps one CandleRing per
+    (pair, interval) up to date
+    """
+
+    def __init__(self, keys, num_candles=RING_CAPACITY, period=FETCH_PERIOD):
+        self.keys = list(keys)
+        self.num_candles = num_candles
+        self.period = period
+        self.rings = {key: CandleRing.create(*key, capacity=max(num_candles, 1)) for key in self.keys}
+        self._stopped = threading.Event()
+
+    def fetch(self):
+        for (pair, interval), ring in self.rings.items():
+            candles = get_24h_btc_prices(pair, interval, self.num_candles, stale_while_revalidate=True)
+            # Stale candles are already in the ring
+            if candles and not candles.stale:
+                ring.publish(candles)
+
+    def run(self):
+        """
+        Fetch every `period` seconds until stop()
+        """
+        self._stopped.clear()
+        while not self._stopped.is_set():
+            started = time.monotonic()
+            self.fetch()
+            self._stopped.wait(max(0.0, self.period - (time.monotonic() - started)))
+
+    def stop(self):
+        self._stopped.set()
+
+    def close(self):
+        for ring in self.rings.values():
+            ring.close()
+
+
+# ----- Worker processes -----
+
+# Rings this worker process has attached to, by (pair, interval)
+_attached = {}
+
+
+def attached_ring(trading_pair, interval):
+    """
+    The ring for (pair, interval), attached once per process
+    """
+    key = (trading_pair, interval)
+    if key not in _attached:
+        _attached[key] = CandleRing.attach(trading_pair, interval)
+    return _attached[key]
+
+
+def _analyze(candles, output):
+    fib_data = calculate_fibonacci_levels(candles, verbose=False)
+    volume_data = analyze_volume(candles, verbose=False)
+    chart = plot_price_and_volume(candles, fib_data, volume_data, output=output) if output else None
+    return fib_data, volume_data, chart
+
+
+def analyze_ring(trading_pair, interval, num_candles=24, output=None):
+    """
+    Fibonacci + volume analysis (and a chart, with output='png'/'svg') straight
+    from the shared ring. Returns (fib_data, volume_data, chart bytes or None).
+    """
+    ring = attached_ring(trading_pair, interval)
+    return ring.consistent(lambda candles: _analyze(candles, output), num_candles)
+
+
+def _analyze_job(job):
+    # Runs in a worker process
+    return job[:2], analyze_ring(*job)
+
+
+def analyze_rings(keys, num_candles=24, output=None, max_workers=None):
+    """
+    Analyze many rings in parallel worker processes.
+    Returns {(pair, interval): (fib_data, volume_data, chart)}
+    """
+    jobs = [(pair, interval, num_candles, output) for pair, interval in keys]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return dict(executor.map(_analyze_job, jobs))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Kraken Shared-Memory Candle Rings')
+    parser.add_argument('mode', choices=['fetch', 'analyze'],
+                        help='fetch: run the single fetcher; analyze: read the rings from worker processes')
+    parser.add_argument('--pair', type=parse_pair, nargs='+', default=['XXBTZUSD'],
+                        help='Trading pairs (e.g., BTC/USD ETH/USD)')
+    parser.add_argument('--interval', type=parse_interval, nargs='+', default=[60],
+                        help='Candle intervals (e.g., 1min 1hour)')
+    parser.add_argument('--candles', type=int, default=24,
+                        help='Candles per analysis')
+    parser.add_argument('--workers', type=int,
+                        help='Analysis worker processes (default: one per CPU)')
+    args = parser.parse_args()
+
+    keys = [(pair, interval) for pair in args.pair for interval in args.interval]
+    if args.mode == 'fetch':
+        fetcher = RingFetcher(keys)
+        print(f"✓ Serving {len(keys)} candle rings - Ctrl+C to stop")
+        try:
+            fetcher.run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            fetcher.close()
+    else:
+        for (pair, interval), (fib_data, volume_data, chart) in analyze_rings(
+                keys, args.candles, max_workers=args.workers).items():
+            print(f"{pair:10s} {interval:6d}  ${fib_data['current_price']:,.2f} | "
+                  f"{fib_data['signal']} | {volume_data['volume_signal']}")
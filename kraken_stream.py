@@ -0,0 +1,232 @@
+import json
+import threading
+
+from kraken_btc_tracker import (
+    Candles, TRADING_PAIRS, INTERVALS,
+    get_24h_btc_prices, calculate_fibonacci_levels, analyze_volume
+)
+
+# websocket-client is only needed for streaming mode
+try:
+    import websocket
+except ImportError:
+    websocket = None
+
+# ===== STREAMING OHLC MODE =====
+# Keeps a live candle window per pair from Kraken's WebSocket "ohlc" channel
+# and re-runs the Fibonacci and volume analysis every time a candle ticks.
+
+# Kraken public WebSocket API (v1)
+WS_URL = "wss://ws.kraken.com"
+
+# Kraken's WebSocket API uses different asset codes for a few coins
+WS_ASSET_CODES = {
+    'BTC': 'XBT',
+    'DOGE': 'XDG'
+}
+
+
+def ws_pair_name(pair_name):
+    """
+    Convert a TRADING_PAIRS name (e.g. 'BTC/USD') to WebSocket notation ('XBT/USD')
+    """
+    base, quote = pair_name.split('/')
+    return f"{WS_ASSET_CODES.get(base, base)}/{WS_ASSET_CODES.get(quote, quote)}"
+
+
+def print_update(pair_name, candles, fib_data, volume_data):
+    """
+    Default update handler - one line per candle tick
+    """
+    print(f"[{candles.time_str(-1)}] {pair_name:10s} ${fib_data['current_price']:,.2f} | "
+          f"{fib_data['signal']} | {volume_data['volume_signal']}")
+
+
+class KrakenStream:
+    """
+    Base for Kraken WebSocket streams: connects, subscribes and hands every
+    message to handle_message(), reconnecting when the connection drops.
+    Subclasses implement subscribe_message(), handle_message() and description().
+    """
+
+    def __init__(self, url=WS_URL):
+        if websocket is None:
+            raise ImportError("Streaming mode needs websocket-client: pip install websocket-client")
+
+        self.url = url
+        self._ws = None
+        self._stopped = threading.Event()
+
+    def subscribe_message(self):
+        raise NotImplementedError
+
+    def handle_message(self, message):
+        raise NotImplementedError
+
+    def description(self):
+        """
+        What is being streamed, for the connect message
+        """
+        raise NotImplementedError
+
+    def on_connect(self):
+        """
+        Called after every (re)connect, before subscribing
+        """
+
+    def run(self, reconnect_delay=5):
+        """
+        Connect, subscribe and process updates until stop() is called.
+        Reconnects automatically if the connection drops.
+        """
+        self._stopped.clear()
+        while not self._stopped.is_set():
+            try:
+                self._ws = websocket.create_connection(self.url, timeout=30)
+                self.on_connect()
+                self._ws.send(self.subscribe_message())
+                print(f"✓ Streaming {self.description()}")
+
+                while not self._stopped.is_set():
+                    message = self._ws.recv()
+                    if not message:
+                        raise websocket.WebSocketConnectionClosedException("Connection closed by server")
+                    self.handle_message(message)
+
+            except (websocket.WebSocketException, OSError) as e:
+                if self._stopped.is_set():
+                    break
+                print(f"Stream disconnected: {e} - reconnecting in {reconnect_delay}s")
+                self._stopped.wait(reconnect_delay)
+            finally:
+                if self._ws is not None:
+                    self._ws.close()
+                    self._ws = None
+
+    def start(self):
+        """
+        Run the stream in a background thread
+        """
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stopped.set()
+        if self._ws is not None:
+            self._ws.close()
+
+
+class OHLCStream(KrakenStream):
+    """
+    Long-running OHLC stream for one or more pairs (names as in TRADING_PAIRS)
+    """
+
+    def __init__(self, pairs=('BTC/USD',), interval=INTERVALS['1min'], num_candles=24,
+                 on_update=print_update, url=WS_URL, seed=True):
+        super().__init__(url)
+
+        self.pairs = list(pairs)
+        self.interval = interval
+        self.num_candles = num_candles
+        self.on_update = on_update
+
+        # WebSocket pair name -> our pair name
+        self._names = {ws_pair_name(name): name for name in self.pairs}
+        # Live candle window per pair
+        self.windows = {name: Candles.empty() for name in self.pairs}
+        # Latest analysis results per pair
+        self.results = {}
+
+        # Start from recent REST history so the analysis is meaningful from the first tick
+        if seed:
+            for name in self.pairs:
+                if name in TRADING_PAIRS:
+                    candles = get_24h_btc_prices(TRADING_PAIRS[name], interval, num_candles)
+                    if candles:
+                        self.windows[name] = candles
+
+    def subscribe_message(self):
+        return json.dumps({
+            'event': 'subscribe',
+            'pair': list(self._names),
+            'subscription': {'name': 'ohlc', 'interval': self.interval}
+        })
+
+    def description(self):
+        return f"{', '.join(self.pairs)} ({self.interval}min candles)"
+
+    def handle_message(self, message):
+        """
+        Process one raw WebSocket message. Returns the pair name if a candle was updated.
+        """
+        data = json.loads(message)
+
+        # Events (heartbeat, systemStatus, subscriptionStatus) are dicts
+        if isinstance(data, dict):
+            if data.get('event') == 'subscriptionStatus' and data.get('status') == 'error':
+                print(f"Subscription error: {data.get('errorMessage')}")
+            return None
+
+        # OHLC update: [channelID, [time, etime, open, high, low, close, vwap, volume, count], "ohlc-N", pair]
+        if len(data) < 4 or not str(data[-2]).startswith('ohlc'):
+            return None
+        name = self._names.get(data[-1])
+        if name is None:
+            return None
+
+        candle = data[1]
+        # Kraken sends the interval's end time - candles are keyed by their start time
+        start_time = int(float(candle[1])) - self.interval * 60
+        values = [float(value) for value in candle[2:8]]
+        self._update_window(name, start_time, values, int(candle[8]))
+
+        candles = self.windows[name]
+        fib_data = calculate_fibonacci_levels(candles, verbose=False)
+        volume_data = analyze_volume(candles, verbose=False)
+        self.results[name] = (fib_data, volume_data)
+
+        if self.on_update:
+            self.on_update(name, candles, fib_data, volume_data)
+        return name
+
+    def _update_window(self, name, start_time, values, count):
+        window = self.windows[name]
+        open_price, high, low, close, vwap, volume = values
+
+        if len(window) and start_time == window.time[-1]:
+            # Same candle ticked again - update it in place
+            i = len(window) - 1
+        elif len(window) and start_time < window.time[-1]:
+            # Late update for a candle we have already moved past
+            return
+        elif len(window) >= self.num_candles:
+            # New candle - shift the window left by one in place
+            for field in Candles.FIELDS:
+                column = getattr(window, field)
+                column[:-1] = column[1:]
+            window._times = None
+            i = len(window) - 1
+        else:
+            # Window not full yet - grow it
+            new = Candles([start_time], [open_price], [high], [low], [close], [vwap], [volume], [count])
+            self.windows[name] = Candles.concat([window, new])
+            return
+
+        window.time[i] = start_time
+        window.open[i] = open_price
+        window.high[i] = high
+        window.low[i] = low
+        window.close[i] = close
+        window.vwap[i] = vwap
+        window.volume[i] = volume
+        window.count[i] = count
+        window._times = None
+
+
+if __name__ == "__main__":
+    stream = OHLCStream(pairs=['BTC/USD', 'ETH/USD'], interval=INTERVALS['1min'], num_candles=24)
+    try:
+        stream.run()
+    except KeyboardInterrupt:
+        stream.stop()
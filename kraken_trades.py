@@ -0,0 +1,397 @@
+import math
+from collections import deque
+
+import numpy as np
+
+import kraken_metrics as metrics
+from kraken_btc_tracker import CANDLE_CACHE_SIZE, Candles, _pair_result, public_request
+
+# ===== TRADES & VOLUME PROFILE =====
+# Individual trades from Kraken's Trades endpoint, paged with the 'last'
+# cursor, fed page by page into streaming aggregators: a volume-at-price
+# histogram (volume profile, point of control, value area) and optional
+# custom candles. Pages are never kept around, and both aggregators have a
+# fixed size, so memory stays bounded however long the trade stream is.
+
+# Trades per page (the endpoint's maximum)
+TRADES_PAGE_SIZE = 1000
+
+# One decoded trade
+TRADE_DTYPE = np.dtype([
+    ('time', 'f8'),
+    ('price', 'f8'),
+    ('volume', 'f8'),
+    ('buy', '?')
+])
+
+# Most price buckets a profile keeps - past this, buckets are merged in pairs
+PROFILE_MAX_BUCKETS = 2000
+
+# Default bucket size as a fraction of the price, rounded down to a power of ten
+PROFILE_TICK_FRACTION = 0.0002
+
+# Share of the volume inside the value area
+VALUE_AREA = 0.70
+
+
+def _decode_trades(rows):
+    # Kraken rows: [price, volume, time, buy/sell, market/limit, misc, trade_id]
+    trades = np.zeros(len(rows), dtype=TRADE_DTYPE)
+    if rows:
+        columns = list(zip(*rows))
+        trades['price'] = np.array(columns[0], dtype=np.float64)
+        trades['volume'] = np.array(columns[1], dtype=np.float64)
+        trades['time'] = np.array(columns[2], dtype=np.float64)
+        trades['buy'] = np.array(columns[3]) == 'b'
+    return trades
+
+
+def fetch_trades(trading_pair='XXBTZUSD', since=None, count=TRADES_PAGE_SIZE):
+    """
+    One page of trades after `since` (unix seconds or a previous 'last' cursor).
+    Returns (TRADE_DTYPE array, last cursor), or None on failure.
+    """
+    params = {'pair': trading_pair, 'count': count}
+    if since is not None:
+        params['since'] = since
+
+    try:
+        data = public_request('Trades', params)
+    except Exception as e:
+        print(f"Error fetching trades: {e}")
+        return None
+
+    if data['error']:
+        print(f"API Error: {data['error']}")
+        return None
+
+    result = data['result']
+    trades = _decode_trades(_pair_result(result, trading_pair))
+    metrics.inc('kraken_trades_processed_total', len(trades))
+    return trades, result['last']
+
+
+def iter_trades(trading_pair='XXBTZUSD', since=None, until=None, max_trades=None):
+    """
+    Yield pages of trades from `since` until `until` (unix seconds), the
+    present, or max_trades trades - whichever comes first. Raises RuntimeError
+    when a page cannot be fetched, so a cut-off stream never passes for a whole one.
+    """
+    received = 0
+    while True:
+        page = fetch_trades(trading_pair, since)
+        if page is None:
+            raise RuntimeError(f"Trades of {trading_pair} after {since} could not be fetched")
+        trades, last = page
+
+        caught_up = len(trades) < TRADES_PAGE_SIZE or last == since
+        if until is not None and len(trades) and trades['time'][-1] >= until:
+            trades = trades[trades['time'] < until]
+            caught_up = True
+        if max_trades is not None and received + len(trades) >= max_trades:
+            trades = trades[:max_trades - received]
+            caught_up = True
+
+        if len(trades):
+            received += len(trades)
+            yield trades
+        if caught_up:
+            return
+        since = last
+
+
+def _auto_tick(price):
+    return 10.0 ** math.floor(math.log10(price * PROFILE_TICK_FRACTION))
+
+
+class VolumeProfile:
+    """
+    Volume-at-price histogram in fixed-size price buckets. Never holds more than
+    max_buckets buckets: when the traded range outgrows them, neighbouring
+    buckets are merged and the bucket size doubles.
+    """
+
+    def __init__(self, tick_size=None, max_buckets=PROFILE_MAX_BUCKETS):
+        self.tick_size = tick_size
+        self.max_buckets = max_buckets
+        self.trades = 0
+        self._base = 0                     # bucket number of self._volume[0]
+        self._volume = np.zeros(0)
+        self._buy_volume = np.zeros(0)
+
+    def __len__(self):
+        return len(self._volume)
+
+    def _coarsen(self):
+        # Merge buckets 2k and 2k+1 into bucket k at twice the size
+        buckets = (self._base + np.arange(len(self._volume))) // 2
+        new_base = self._base // 2
+        self._volume = np.bincount(buckets - new_base, weights=self._volume)
+        self._buy_volume = np.bincount(buckets - new_base, weights=self._buy_volume)
+        self._base = new_base
+        self.tick_size *= 2
+
+    def add(self, price, volume, buy=None):
+        """
+        Add trades (arrays of price, volume and optionally buy flags)
+        """
+        price = np.asarray(price, dtype=np.float64)
+        volume = np.asarray(volume, dtype=np.float64)
+        if not len(price):
+            return
+        if self.tick_size is None:
+            self.tick_size = _auto_tick(float(price[0]))
+
+        buckets = np.floor(price / self.tick_size).astype(np.int64)
+        low, high = int(buckets.min()), int(buckets.max())
+        if len(self._volume):
+            low, high = min(low, self._base), max(high, self._base + len(self._volume) - 1)
+        while high - low + 1 > self.max_buckets:
+            if len(self._volume):
+                self._coarsen()
+            else:
+                self.tick_size *= 2
+            buckets //= 2
+            low, high = low // 2, high // 2
+
+        # Grow to cover [low, high]
+        if not len(self._volume):
+            self._base = low
+        before, after = self._base - low, high - (self._base + len(self._volume) - 1)
+        if before > 0 or after > 0:
+            padding = (max(before, 0), max(after, 0))
+            self._volume = np.pad(self._volume, padding)
+            self._buy_volume = np.pad(self._buy_volume, padding)
+            self._base = low
+
+        offsets = buckets - self._base
+        size = len(self._volume)
+        self._volume += np.bincount(offsets, weights=volume, minlength=size)
+        if buy is not None:
+            self._buy_volume += np.bincount(offsets, weights=volume * np.asarray(buy), minlength=size)
+        self.trades += len(price)
+
+    @property
+    def prices(self):
+        """
+        Lower edge of every price bucket
+        """
+        return (self._base + np.arange(len(self._volume))) * self.tick_size
+
+    @property
+    def volumes(self):
+        return self._volume
+
+    def point_of_control(self):
+        """
+        Middle of the bucket with the most volume
+        """
+        if not len(self._volume):
+            return None
+        return (self._base + int(self._volume.argmax()) + 0.5) * self.tick_size
+
+    def value_area(self, fraction=VALUE_AREA):
+        """
+        (low, high) price range around the point of control holding `fraction`
+        of the volume - grown one bucket at a time towards the busier side
+        """
+        if not len(self._volume):
+            return None, None
+        volume = self._volume
+        target = volume.sum() * fraction
+        low = high = int(volume.argmax())
+        inside = volume[low]
+        while inside < target and (low > 0 or high < len(volume) - 1):
+            below = volume[low - 1] if low > 0 else -1.0
+            above = volume[high + 1] if high < len(volume) - 1 else -1.0
+            if above >= below:
+                high += 1
+                inside += above
+            else:
+                low -= 1
+                inside += below
+        return (self._base + low) * self.tick_size, (self._base + high + 1) * self.tick_size
+
+    def summary(self):
+        total_volume = float(self._volume.sum())
+        value_area_low, value_area_high = self.value_area()
+        return {
+            'tick_size': self.tick_size,
+            'trades': self.trades,
+            'total_volume': total_volume,
+            'buy_volume': float(self._buy_volume.sum()),
+            'poc': self.point_of_control(),
+            'value_area_low': value_area_low,
+            'value_area_high': value_area_high,
+            'prices': self.prices.tolist(),
+            'volumes': self._volume.tolist()
+        }
+
+
+class TradeCandles:
+    """
+    Candles built from trades (interval in minutes, like INTERVALS). Keeps the
+    last max_candles closed candles plus the one still open.
+    """
+
+    def __init__(self, interval=1, max_candles=CANDLE_CACHE_SIZE):
+        self.interval = interval
+        self._closed = deque(maxlen=max_candles)
+        self._open = None   # [time, open, high, low, close, price*volume, volume, count]
+
+    def __len__(self):
+        return len(self._closed)
+
+    def add(self, trades):
+        """
+        Add a page of trades (TRADE_DTYPE, in time order)
+        """
+        if not len(trades):
+            return
+        seconds = self.interval * 60
+        starts = (trades['time'] // seconds).astype(np.int64) * seconds
+        price, volume = trades['price'], trades['volume']
+
+        # One group per candle the page touches
+        first = np.concatenate([[0], np.flatnonzero(np.diff(starts)) + 1])
+        last = np.concatenate([first[1:], [len(trades)]]) - 1
+        groups = zip(starts[first].tolist(), price[first].tolist(),
+                     np.maximum.reduceat(price, first).tolist(),
+                     np.minimum.reduceat(price, first).tolist(),
+                     price[last].tolist(),
+                     np.add.reduceat(price * volume, first).tolist(),
+                     np.add.reduceat(volume, first).tolist(),
+                     (last - first + 1).tolist())
+
+        for group in groups:
+            current = self._open
+            if current is not None and current[0] == group[0]:
+                # Same candle as the end of the previous page
+                current[2] = max(current[2], group[2])
+                current[3] = min(current[3], group[3])
+                current[4] = group[4]
+                current[5] += group[5]
+                current[6] += group[6]
+                current[7] += group[7]
+                continue
+            if current is not None:
+                self._closed.append(current)
+            self._open = list(group)
+
+    def candles(self, include_open=False):
+        """
+        Candles container (vwap from the trades themselves)
+        """
+        rows = list(self._closed)
+        if include_open and self._open is not None:
+            rows.append(self._open)
+        if not rows:
+            return Candles.empty()
+        time, open, high, low, close, turnover, volume, count = (np.array(column) for column in zip(*rows))
+        vwap = np.divide(turnover, volume, out=close.copy(), where=volume > 0)
+        return Candles(time, open, high, low, close, vwap, volume, count)
+
+
+class TradeAggregator:
+    """
+    Volume profile (and optionally custom candles) over a stream of trade pages
+    """
+
+    def __init__(self, tick_size=None, candle_interval=None, max_buckets=PROFILE_MAX_BUCKETS,
+                 max_candles=CANDLE_CACHE_SIZE):
+        self.profile = VolumeProfile(tick_size, max_buckets)
+        self.candles = TradeCandles(candle_interval, max_candles) if candle_interval else None
+        self.last_price = None
+
+    def add(self, trades):
+        if not len(trades):
+            return
+        self.profile.add(trades['price'], trades['volume'], trades['buy'])
+        if self.candles is not None:
+            self.candles.add(trades)
+        self.last_price = float(trades['price'][-1])
+
+    def consume(self, pages):
+        for trades in pages:
+            self.add(trades)
+        return self
+
+    def summary(self):
+        summary = self.profile.summary()
+        summary['last_price'] = self.last_price
+        if self.candles is not None:
+            summary['candles'] = self.candles.candles(include_open=True)
+        return summary
+
+
+def print_volume_profile(profile_data, top_levels=5):
+    print("\n" + "="*50)
+    print("📊 VOLUME PROFILE")
+    print("="*50)
+    if profile_data.get('truncated'):
+        print(f"⚠️  Capped at {profile_data['trades']:,} trades - later trades are left out")
+    if not profile_data.get('complete', True):
+        print("⚠️  Fetching trades failed part way - later trades are left out")
+    if not profile_data['trades']:
+        print("No trades in this period")
+        print("="*50 + "\n")
+        return
+
+    poc = profile_data['poc']
+    low, high = profile_data['value_area_low'], profile_data['value_area_high']
+    buy_share = profile_data['buy_volume'] / profile_data['total_volume'] if profile_data['total_volume'] else 0.0
+    print(f"Trades:               {profile_data['trades']:,}")
+    print(f"Traded Volume:        {profile_data['total_volume']:,.2f}")
+    print(f"Buy Volume:           {buy_share:.1%}")
+    print(f"Point of Control:     ${poc:,.2f}")
+    print(f"Value Area ({VALUE_AREA:.0%}):     ${low:,.2f} - ${high:,.2f}")
+    print(f"Bucket Size:          ${profile_data['tick_size']:,.2f}")
+
+    volumes = np.asarray(profile_data['volumes'])
+    prices = np.asarray(profile_data['prices'])
+    print("-" * 50)
+    print("Busiest Price Levels:")
+    for i in np.argsort(volumes)[::-1][:top_levels]:
+        print(f"  ${prices[i]:>12,.2f}  {volumes[i]:>12,.4f}")
+
+    last_price = profile_data.get('last_price')
+    if last_price is not None:
+        print("-" * 50)
+        if last_price > high:
+            location = "ABOVE the value area - buyers in control 📈"
+        elif last_price < low:
+            location = "BELOW the value area - sellers in control 📉"
+        else:
+            location = "INSIDE the value area - balanced ↔️"
+        print(f"💡 PRICE IS {location}")
+    print("="*50 + "\n")
+
+
+def volume_profile(trading_pair='XXBTZUSD', since=None, until=None, tick_size=None,
+                   candle_interval=None, max_trades=None, verbose=True):
+    """
+    Fetch every trade between since and until (unix seconds) and return the
+    volume profile summary (plus 'candles' when candle_interval is given).
+    'truncated' is set when max_trades cut the period short, 'complete' is
+    False when a page failed and only the trades before it were counted.
+    """
+    aggregator = TradeAggregator(tick_size, candle_interval)
+    complete = True
+    try:
+        aggregator.consume(iter_trades(trading_pair, since, until, max_trades))
+    except RuntimeError as e:
+        # Keep what was counted, but don't pass it off as the whole period
+        print(f"⚠️  {e}")
+        complete = False
+    profile_data = aggregator.summary()
+    profile_data['truncated'] = max_trades is not None and profile_data['trades'] >= max_trades
+    profile_data['complete'] = complete
+    if verbose:
+        print(f"✓ Aggregated {profile_data['trades']:,} trades of {trading_pair}")
+        print_volume_profile(profile_data)
+    return profile_data
+
+
+if __name__ == "__main__":
+    import time
+    volume_profile('XXBTZUSD', since=int(time.time()) - 3600, candle_interval=5)
@@ -0,0 +1,89 @@
+import pytest
+import requests
+
+import kraken_btc_tracker as tracker
+
+
+class StubResponse:
+    status_code = 200
+    content = b'{"error":[],"result":{}}'
+
+    def raise_for_status(self):
+        pass
+
+
+class StubSession:
+    """
+    get() raises the queued exceptions in order, then answers normally
+    """
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+
+    def get(self, url, params=None, timeout=None):
+        if self.errors:
+            raise self.errors.pop(0)
+        return StubResponse()
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    monkeypatch.setattr(tracker.RequestScheduler, '_retry_wait', lambda *args: None)
+    return tracker.RequestScheduler(rate=1000, burst=1000, retries=0)
+
+
+def open_circuit(scheduler, monkeypatch):
+    session = StubSession([requests.exceptions.ConnectionError()] * 100)
+    monkeypatch.setattr(tracker, 'get_session', lambda: session)
+    breaker = scheduler.breaker('OHLC')
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            scheduler._fetch('http://stub/0/public/OHLC', {})
+    assert breaker.state == 'open'
+    # Skip the cool-down
+    breaker.reset_timeout = 0
+    return breaker
+
+
+@pytest.mark.parametrize('error', [
+    requests.exceptions.ChunkedEncodingError(),
+    requests.exceptions.ContentDecodingError(),
+    requests.exceptions.TooManyRedirects(),
+    RuntimeError('unexpected')
+])
+def test_failed_trial_reopens_circuit(scheduler, monkeypatch, error):
+    breaker = open_circuit(scheduler, monkeypatch)
+
+    session = StubSession([error])
+    monkeypatch.setattr(tracker, 'get_session', lambda: session)
+    with pytest.raises(type(error)):
+        scheduler._fetch('http://stub/0/public/OHLC', {})
+    # The trial ended - the next call is the next trial, and it succeeds
+    assert not breaker._trial
+
+    assert scheduler._fetch('http://stub/0/public/OHLC', {}) == {'error': [], 'result': {}}
+    assert breaker.state == 'closed'
+
+
+def test_request_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(tracker.RequestScheduler, '_retry_wait', lambda *args: None)
+    scheduler = tracker.RequestScheduler(rate=1000, burst=1000, retries=2)
+    session = StubSession([requests.exceptions.ChunkedEncodingError(),
+                           requests.exceptions.ContentDecodingError()])
+    monkeypatch.setattr(tracker, 'get_session', lambda: session)
+    assert scheduler._fetch('http://stub/0/public/OHLC', {}) == {'error': [], 'result': {}}
+    assert scheduler.breaker('OHLC').state == 'closed'
+
+
+def test_interrupted_trial_is_not_a_failure(scheduler, monkeypatch):
+    breaker = open_circuit(scheduler, monkeypatch)
+    failures = breaker._failures
+
+    session = StubSession([KeyboardInterrupt()])
+    monkeypatch.setattr(tracker, 'get_session', lambda: session)
+    with pytest.raises(KeyboardInterrupt):
+        scheduler._fetch('http://stub/0/public/OHLC', {})
+    # The trial was handed back without counting against the endpoint
+    assert not breaker._trial
+    assert breaker._failures == failures
+    assert breaker.state == 'half-open'
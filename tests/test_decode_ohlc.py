@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+import kraken_btc_tracker as tracker
+
+# Candles in the test bodies
+N = 30
+
+ROWS = [[1700000000 + 60 * i, f"{100 + i}.5", f"{101 + i}.25", f"{99 + i}.0", f"{100 + i}.75",
+         f"{100 + i}.6", f"{i * 7 % 11}.{i:04d}", i % 9] for i in range(N)]
+
+
+def body(result, compact=True):
+    separators = (',', ':') if compact else (', ', ': ')
+    return json.dumps({'error': [], 'result': result}, separators=separators).encode()
+
+
+LAYOUTS = {
+    'pair-first': ('XXBTZUSD', {'XXBTZUSD': ROWS, 'last': 1700001740}),
+    'last-first': ('XXBTZUSD', {'last': 1700001740, 'XXBTZUSD': ROWS}),
+    'altname-key': ('XBTUSD', {'XXBTZUSD': ROWS, 'last': 1700001740}),
+    'altname-last-first': ('XBTUSD', {'last': 1700001740, 'XXBTZUSD': ROWS})
+}
+
+
+@pytest.mark.parametrize('compact', [True, False])
+@pytest.mark.parametrize('layout', list(LAYOUTS))
+@pytest.mark.parametrize('num_candles', [0, 1, N - 1, N, N + 1])
+def test_tail_matches_json_loads(layout, compact, num_candles):
+    pair, result = LAYOUTS[layout]
+    payload = body(result, compact)
+
+    errors, rows, last = tracker.decode_ohlc(payload, pair, num_candles)
+
+    expected = json.loads(payload)['result']
+    assert errors == []
+    assert rows == (ROWS[-num_candles:] if num_candles else [])
+    assert rows == (expected['XXBTZUSD'][-num_candles:] if num_candles else [])
+    assert last == expected['last']
+
+
+@pytest.mark.parametrize('layout', list(LAYOUTS))
+def test_all_rows_without_num_candles(layout):
+    pair, result = LAYOUTS[layout]
+    assert tracker.decode_ohlc(body(result), pair) == ([], ROWS, 1700001740)
+
+
+def test_api_errors_are_returned():
+    payload = json.dumps({'error': ['EQuery:Unknown asset pair'], 'result': {}}).encode()
+    assert tracker.decode_ohlc(payload, 'XXBTZUSD', 24) == (['EQuery:Unknown asset pair'], [], None)